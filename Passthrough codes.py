@@ -129,3 +129,224 @@ pi.set_servo_pulsewidth(PWM_OUT_ESC, 0)
 pi.set_servo_pulsewidth(PWM_OUT_SERVO, 0)
 pi.stop()
 
+
+# ### low-jitter passthrough: batched edge reads through a notification pipe ###
+# The callbacks above cost one Python call per edge and one socket round-trip
+# per falling edge, so output timing depends on the GIL. Here the pigpio daemon
+# writes every level change on the input pins into a notification pipe, we read
+# them in batches, work out all the pulse widths from a batch in one go, and
+# only send a new width when it has moved by more than DEADBAND_US.
+# Input-to-output latency (falling edge to set command sent) is reported every
+# few seconds and at the end.
+
+# In[ ]:
+
+
+import pigpio
+import time
+import os
+import struct
+
+# GPIOs
+PWM_IN_THROTTLE = 23  # Pin 16
+PWM_IN_STEERING = 24  # Pin 18
+PWM_OUT_ESC = 13      # Pin 33
+PWM_OUT_SERVO = 19    # Pin 35
+
+# Input pin -> output pin
+CHANNELS = {PWM_IN_THROTTLE: PWM_OUT_ESC, PWM_IN_STEERING: PWM_OUT_SERVO}
+
+DEADBAND_US = 4        # Ignore width changes smaller than this (receiver jitter)
+REPORT_EVERY = 5.0     # Seconds between latency reports
+READ_RECORDS = 256     # Notification records read from the pipe at most per batch
+
+# Each notification record is 12 bytes: seqno, flags, tick, level (bits for GPIO 0-31)
+RECORD = struct.Struct("HHII")
+NTFY_FLAGS_EVENT = 1 << 7
+NTFY_FLAGS_ALIVE = 1 << 6
+NTFY_FLAGS_WDOG = 1 << 5
+
+pi = pigpio.pi()
+if not pi.connected:
+    print("Could not connect to pigpio daemon!")
+    exit()
+
+for gpio_in, gpio_out in CHANNELS.items():
+    pi.set_mode(gpio_in, pigpio.INPUT)
+    pi.set_mode(gpio_out, pigpio.OUTPUT)
+
+# Open the notification pipe for just the input pins
+handle = pi.notify_open()
+pipe = os.open(f"/dev/pigpio{handle}", os.O_RDONLY)
+pi.notify_begin(handle, sum(1 << gpio for gpio in CHANNELS))
+
+# The daemon's tick is a 32-bit microsecond clock with its own zero. Keep an
+# offset to our own clock so latency can be measured without asking the
+# daemon for the time after every set command.
+def tick_offset():
+    before = time.perf_counter_ns() // 1000
+    tick = pi.get_current_tick()
+    after = time.perf_counter_ns() // 1000
+    return (before + after) // 2 - tick
+
+def local_tick(offset):
+    return (time.perf_counter_ns() // 1000 - offset) & 0xFFFFFFFF
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+def report_latency(values):
+    if values:
+        print(f"{pulses} pulses, {commands} set commands, latency µs "
+              f"p50 {percentile(values, 0.5)}  p95 {percentile(values, 0.95)}  "
+              f"p99 {percentile(values, 0.99)}  max {max(values)}")
+
+offset = tick_offset()
+last_level = pi.read_bank_1()
+rise_tick = {}              # Input pin -> tick of its last rising edge
+sent_width = {}             # Output pin -> width last sent
+latencies = []              # µs from falling edge to set command, since the last report
+all_latencies = []
+pulses = 0
+commands = 0
+leftover = b""
+next_report = time.monotonic() + REPORT_EVERY
+
+print("Batched PWM passthrough running. Press Ctrl+C to stop.")
+try:
+    while True:
+        # Blocks until the daemon has something, then takes everything waiting (up to READ_RECORDS)
+        data = leftover + os.read(pipe, RECORD.size * READ_RECORDS)
+        usable = len(data) - len(data) % RECORD.size
+        data, leftover = data[:usable], data[usable:]
+
+        # Decode the whole batch, keeping only the newest width per channel
+        widths = {}
+        for seqno, flags, tick, level in RECORD.iter_unpack(data):
+            if flags & (NTFY_FLAGS_EVENT | NTFY_FLAGS_ALIVE | NTFY_FLAGS_WDOG):
+                continue
+            changed = level ^ last_level
+            last_level = level
+            for gpio_in in CHANNELS:
+                bit = 1 << gpio_in
+                if not changed & bit:
+                    continue
+                if level & bit:
+                    rise_tick[gpio_in] = tick
+                elif gpio_in in rise_tick:
+                    widths[gpio_in] = (pigpio.tickDiff(rise_tick[gpio_in], tick), tick)
+                    pulses += 1
+
+        # One set command per channel per batch, and only past the deadband
+        for gpio_in, (width, fall_tick) in widths.items():
+            width = max(1000, min(2000, width))  # Clamp to 1000–2000 µs
+            gpio_out = CHANNELS[gpio_in]
+            if abs(width - sent_width.get(gpio_out, 0)) > DEADBAND_US:
+                pi.set_servo_pulsewidth(gpio_out, width)
+                sent_width[gpio_out] = width
+                commands += 1
+                latencies.append(pigpio.tickDiff(fall_tick, local_tick(offset)))
+
+        if time.monotonic() >= next_report:
+            report_latency(latencies)
+            all_latencies += latencies
+            latencies = []
+            offset = tick_offset()      # Re-sync for clock drift
+            next_report = time.monotonic() + REPORT_EVERY
+except KeyboardInterrupt:
+    pass
+
+print("Overall:")
+report_latency(all_latencies + latencies)
+
+# Cleanup
+pi.notify_close(handle)
+os.close(pipe)
+for gpio_out in CHANNELS.values():
+    pi.set_servo_pulsewidth(gpio_out, 0)
+pi.stop()
+
+
+# ### configurable passthrough: expo, rate limit, mixing and filtering from mixer.json ###
+# Replaces the fixed DAMPENING factor above with the rc_mixer pipeline. Edit
+# mixer.json while this runs and the new settings apply from the next pulse,
+# no need to restart (python rc_mixer.py --write-config mixer.json makes one).
+
+# In[ ]:
+
+
+import pigpio
+import time
+
+import rc_receiver
+import rc_mixer
+
+# GPIOs
+PWM_IN_THROTTLE = 23  # Pin 16
+PWM_IN_STEERING = 24  # Pin 18
+PWM_OUT_ESC = 13      # Pin 33
+PWM_OUT_SERVO = 19    # Pin 35
+
+MIXER_CONFIG = "mixer.json"
+DEADBAND_US = 4          # Ignore output changes smaller than this (receiver jitter)
+FAILSAFE_CHECK = rc_receiver.FAILSAFE_TIMEOUT_US / 2e6   # Seconds between failsafe checks
+WATCH_EVERY = 1.0        # Seconds between config file checks and clock re-syncs
+
+# Channel order matches the "channels" list in the mixer config
+OUTPUTS = [PWM_OUT_ESC, PWM_OUT_SERVO]
+
+pi = pigpio.pi()
+if not pi.connected:
+    print("Could not connect to pigpio daemon!")
+    exit()
+
+mixer = rc_mixer.Mixer()
+mixer.watch(MIXER_CONFIG)
+
+sent_width = {}          # Output pin -> width last sent
+
+# Every pulse goes through the mixer (its filters need them all), but only a
+# change past the deadband costs a set command
+def on_pulse(channel, width, tick):
+    width = mixer.pulse(channel, width)
+    gpio_out = OUTPUTS[channel]
+    if abs(width - sent_width.get(gpio_out, 0)) > DEADBAND_US:
+        pi.set_servo_pulsewidth(gpio_out, width)
+        sent_width[gpio_out] = width
+
+for gpio_out in OUTPUTS:
+    pi.set_mode(gpio_out, pigpio.OUTPUT)
+
+table = rc_receiver.ChannelTable(2)
+decoder = rc_receiver.PWMDecoder(table, [PWM_IN_THROTTLE, PWM_IN_STEERING], on_pulse)
+callbacks = rc_receiver.attach(pi, decoder)
+clock = rc_receiver.TickClock(pi)
+
+print(f"Mixed PWM passthrough running, edit {MIXER_CONFIG} to retune. Press Ctrl+C to stop.")
+next_watch = time.monotonic() + WATCH_EVERY
+try:
+    while True:
+        time.sleep(FAILSAFE_CHECK)
+        if time.monotonic() >= next_watch:
+            if mixer.watch(MIXER_CONFIG):
+                print("Reloaded", MIXER_CONFIG)
+            clock.sync()        # Follow clock drift, or lost() drifts with it
+            next_watch += WATCH_EVERY
+        # Receiver gone quiet: hold neutral until it comes back, and start the
+        # mixer's filters afresh so the old sticks aren't replayed on return
+        if table.lost(clock.now()):
+            mixer.reset()
+            for gpio_out in OUTPUTS:
+                if sent_width.get(gpio_out) != rc_receiver.NEUTRAL_US:
+                    pi.set_servo_pulsewidth(gpio_out, rc_receiver.NEUTRAL_US)
+                    sent_width[gpio_out] = rc_receiver.NEUTRAL_US
+except KeyboardInterrupt:
+    pass
+
+# Cleanup
+for cb in callbacks:
+    cb.cancel()
+for gpio_out in OUTPUTS:
+    pi.set_servo_pulsewidth(gpio_out, 0)
+pi.stop()
@@ -6,295 +6,402 @@
 
 import tkinter as tk
 import random
+import argparse
+import time
+import csv
+from collections import deque
 
-# === Game Constants ===
-CELL_SIZE = 20                 # Size of each square cell in pixels
-GRID_WIDTH = 40                # Number of cells horizontally
-GRID_HEIGHT = 40               # Number of cells vertically
-BORDER_OFFSET = 4 * 4 // CELL_SIZE  # Accounts for 4 border layers of 4px each
-
-# Direction mapping
-DIRECTIONS = {
-    "Up": (0, -1),
-    "Down": (0, 1),
-    "Left": (-1, 0),
-    "Right": (1, 0),
-}
-
-# === Game State Variables ===
-snake = [(20, 20)]            # Player snake starting position
-direction = "Right"           # Initial direction
-snake_rects = []              # Graphics for each snake segment
+# The rules, constants and headless runs live in snake_engine.py (no Tk there)
+from snake_engine import (ENEMY_AIS, GRID_HEIGHT, GRID_WIDTH, SnakeGame,
+                          game_for_replay, load_replays, play_headless, run_headless, save_replays)
 
+CELL_SIZE = 20       # Pixels per cell; the command line below shrinks it to fit big boards
+
+symbols = ["π", "Σ", "√", "∫", "θ", "Δ", "∞", "ℏ", "∇"]  # Fun food symbols
+
+# === Tk Front End ===
+# Only draws what the engine says and forwards key presses to it.
+snake_sprite = None           # Graphics for the player snake
+enemy_sprites = []            # One per enemy
+ENEMY_COLORS = ["red", "orange", "magenta", "deep sky blue", "gold", "hot pink"]
 reset_btn = None              # Reference to reset button
-food_pos = None               # Coordinates of the current food
-food_symbol = None           # The symbol string shown as food
-food_item = None             # Canvas object for the food
-score = 0                    # Player score
-top_score = 0                # Highest score this session
+food_items = {}               # Canvas text item for each food position drawn
 score_text = None
 top_score_text = None
 
-symbols = ["π", "Σ", "√", "∫", "θ", "Δ", "∞", "ℏ", "∇"]  # Fun food symbols
+# === Fixed-Timestep Game Loop ===
+# Ticks are scheduled against an absolute clock: each one is due exactly
+# tick_ms() after the previous one was due, however late the last after()
+# fired or however long the tick took, so the game speed doesn't drift. If the
+# window falls behind it runs up to MAX_CATCH_UP ticks in one go, and past
+# that it gives up on the missed time rather than spiralling.
+# Drawing runs on its own timer at render_fps and only redraws after the game
+# has moved, so the simulation rate and the frame rate are independent.
+# Optional stats: a small overlay with tick rate and logic/render/lateness
+# timings, and/or a CSV with one row per tick and per frame.
+MAX_CATCH_UP = 5
+
+class GameLoop:
+    def __init__(self, tick, render, tick_ms, on_stop, render_fps=60, show_stats=False, stats_file=None):
+        self.tick = tick             # advances the game, returns False when it's over
+        self.render = render
+        self.tick_ms = tick_ms       # current tick length in ms
+        self.on_stop = on_stop
+        self.frame_ms = max(1, int(1000 / render_fps))
+        self.show_stats = show_stats
+        self.stats_writer = None
+        if stats_file:
+            self.stats_out = open(stats_file, "w", newline="")
+            self.stats_writer = csv.writer(self.stats_out)
+            self.stats_writer.writerow(["event", "tick", "time_s", "ms", "late_ms"])
+        self.logic_ms = deque(maxlen=120)
+        self.render_ms = deque(maxlen=120)
+        self.late_ms = deque(maxlen=120)
+        self.tick_times = deque(maxlen=120)
+        self.ticks = 0
+        self.overlay = None
+        self.overlay_time = 0
+        self.running = False
+        self.pending = []
+
+    def start(self):
+        self.stop()
+        self.running = True
+        self.dirty = True
+        self.next_tick = time.perf_counter()
+        if self.show_stats:
+            self.overlay = canvas.create_text(CELL_SIZE * 2, int(canvas.cget("height")) - 10, anchor="sw",
+                                              text="", font=("Courier", 10), fill="gray")
+        self.pending = [window.after(0, self.run_ticks), window.after(self.frame_ms, self.run_frame)]
+
+    def stop(self):
+        self.running = False
+        for after_id in self.pending:
+            window.after_cancel(after_id)
+        self.pending = []
+
+    def run_ticks(self):
+        now = time.perf_counter()
+        ran = 0
+        while self.running and now >= self.next_tick and ran < MAX_CATCH_UP:
+            late = (now - self.next_tick) * 1000
+            alive = self.tick()
+            done = time.perf_counter()
+            self.record("logic", (done - now) * 1000, late)
+            self.tick_times.append(done)
+            self.next_tick += self.tick_ms() / 1000
+            self.dirty = True
+            ran += 1
+            now = done
+            if not alive:
+                self.running = False
+                self.run_frame()
+                self.on_stop()
+                return
+        if now - self.next_tick > MAX_CATCH_UP * self.tick_ms() / 1000:
+            self.next_tick = now
+        delay = max(1, int((self.next_tick - time.perf_counter()) * 1000))
+        self.pending[0] = window.after(delay, self.run_ticks)
+
+    def run_frame(self):
+        if self.dirty:
+            start = time.perf_counter()
+            self.render()
+            self.record("render", (time.perf_counter() - start) * 1000, 0)
+            self.dirty = False
+            self.update_overlay()
+        if self.running:
+            self.pending[1] = window.after(self.frame_ms, self.run_frame)
+
+    def record(self, event, ms, late):
+        if event == "logic":
+            self.ticks += 1
+            self.logic_ms.append(ms)
+            self.late_ms.append(late)
+        else:
+            self.render_ms.append(ms)
+        if self.stats_writer:
+            self.stats_writer.writerow([event, self.ticks, f"{time.perf_counter():.6f}", f"{ms:.4f}", f"{late:.3f}"])
 
-# Enemy snake setup
-enemy_snake = [(5, 5), (5, 6)]
-enemy_rects = []
+    def update_overlay(self):
+        now = time.perf_counter()
+        if self.overlay is None or now - self.overlay_time < 0.25 or len(self.tick_times) < 2:
+            return
+        self.overlay_time = now
+        rate = (len(self.tick_times) - 1) / (self.tick_times[-1] - self.tick_times[0])
+        late = sorted(self.late_ms)[int(len(self.late_ms) * 0.95)]
+        canvas.itemconfig(self.overlay, text=(
+            f"{rate:5.1f} ticks/s  logic {sum(self.logic_ms) / len(self.logic_ms):.2f} ms  "
+            f"render {sum(self.render_ms) / max(1, len(self.render_ms)):.2f} ms  late p95 {late:.1f} ms"))
+
+    def close(self):
+        self.stop()
+        if self.stats_writer:
+            self.stats_out.close()
+            self.stats_writer = None
 
 # === Main Game Launcher ===
-def launch_window():
-    global canvas, snake_rects, direction, window, reset_btn
-    global food_item, score_text, top_score_text, enemy_rects
+# With replays, those games are played back one after another at speed times
+# normal pace instead of reading the keyboard. With record_file, every
+# finished game is saved to that file. show_stats and stats_file turn on the
+# game loop's timing overlay and CSV.
+def launch_window(game, replays=None, speed=1.0, record_file=None,
+                  render_fps=60, show_stats=False, stats_file=None):
+    global canvas, window
+    replays = list(replays or [])
+    recorded = []
 
     # Create window and canvas
     window = tk.Tk()
     window.title("Snake Game")
     window.resizable(False, False)
 
-    width = CELL_SIZE * GRID_WIDTH
-    height = CELL_SIZE * GRID_HEIGHT
+    width = CELL_SIZE * game.width
+    height = CELL_SIZE * game.height
     canvas = tk.Canvas(window, width=width, height=height, bg="black")
     canvas.pack()
 
-    # Initial draw
-    draw_border()
-    draw_snake()
-    draw_enemy_snake()
-    spawn_food()
-    draw_scores()
-
-    # === Main Snake Movement Logic ===
-    def move_snake():
-        global snake, snake_rects, direction, reset_btn
-        global food_pos, food_item, score, score_text, top_score, top_score_text
-        global enemy_snake, enemy_rects
-
-        dx, dy = DIRECTIONS[direction]
-        head_x, head_y = snake[0]
-        new_head = (head_x + dx, head_y + dy)
-
-        # Game over checks
-        if (
-            new_head[0] < BORDER_OFFSET or new_head[0] >= GRID_WIDTH - BORDER_OFFSET or
-            new_head[1] < BORDER_OFFSET or new_head[1] >= GRID_HEIGHT - BORDER_OFFSET or
-            new_head in snake or
-            new_head in enemy_snake
-        ):
-            canvas.create_text(
-                CELL_SIZE * GRID_WIDTH // 2,
-                CELL_SIZE * GRID_HEIGHT // 2 - 20,
-                text="GAME OVER",
-                font=("Courier", 32, "bold"),
-                fill="red"
-            )
-
-            # Update top score
-            if score > top_score:
-                top_score = score
-                canvas.itemconfig(top_score_text, text=f"Top Score: {top_score}")
-
-            # Show reset button
-            reset_btn = tk.Button(
-                window, text="Reset Game",
-                font=("Courier", 14),
-                bg="black", fg="lime",
-                command=reset_game
-            )
-            reset_btn.place(
-                x=CELL_SIZE * GRID_WIDTH // 2 - 60,
-                y=CELL_SIZE * GRID_HEIGHT // 2 + 10
-            )
-            return
+    # Speed scales with snake length
+    def tick_length():
+        delay = max(50, 150 - (len(game.snake) - 1) * 5)
+        return delay / speed if game.playback else delay
 
-        # Check food collision
-        if new_head == food_pos:
-            snake = [new_head] + snake
-            canvas.delete(food_item)
-            score += 1
-            canvas.itemconfig(score_text, text=f"Score: {score}")
-            spawn_food()
-            rect = canvas.create_rectangle(0, 0, 0, 0, fill="lime", outline="")
-            snake_rects.insert(0, rect)
-        else:
-            snake = [new_head] + snake[:-1]
+    # === Game Over ===
+    def game_over():
+        global reset_btn
 
-        # Update graphics for player snake
-        for i, (x, y) in enumerate(snake):
-            canvas.coords(snake_rects[i],
-                          x * CELL_SIZE, y * CELL_SIZE,
-                          (x + 1) * CELL_SIZE, (y + 1) * CELL_SIZE)
+        if record_file and not game.playback:
+            recorded.append(game.replay)
+            save_replays(record_file, recorded)
+        if replays:
+            window.after(1000, next_replay)
+            return
+        canvas.create_text(
+            CELL_SIZE * game.width // 2,
+            CELL_SIZE * game.height // 2 - 20,
+            text="GAME OVER",
+            font=("Courier", 32, "bold"),
+            fill="red"
+        )
+        canvas.itemconfig(top_score_text, text=f"Top Score: {game.top_score}")
+
+        # Show reset button
+        reset_btn = tk.Button(
+            window, text="Reset Game",
+            font=("Courier", 14),
+            bg="black", fg="lime",
+            command=reset_game
+        )
+        reset_btn.place(
+            x=CELL_SIZE * game.width // 2 - 60,
+            y=CELL_SIZE * game.height // 2 + 10
+        )
 
-        # Move enemy
-        move_enemy()
+    loop = GameLoop(game.step, lambda: render(game), tick_length, game_over,
+                    render_fps, show_stats, stats_file)
 
-        # Speed scales with snake length
-        speed = max(50, 150 - (len(snake) - 1) * 5)
-        window.after(speed, move_snake)
+    def start_game():
+        canvas.delete("all")
+        draw_everything(game)
+        loop.start()
+
+    def next_replay():
+        game.start_playback(replays.pop(0))
+        start_game()
 
     # === Player Input ===
     def change_direction(event):
-        global direction
-        if event.keysym in DIRECTIONS:
-            opposite = {"Up": "Down", "Down": "Up", "Left": "Right", "Right": "Left"}
-            if direction != opposite[event.keysym]:
-                direction = event.keysym
+        if not game.playback:
+            game.queue_direction(event.keysym)
 
     # === Game Reset ===
     def reset_game():
-        global snake, snake_rects, direction, reset_btn
-        global food_item, food_pos, score, score_text
-        global enemy_snake, enemy_rects
+        global reset_btn
 
         if reset_btn:
             reset_btn.destroy()
             reset_btn = None
 
-        canvas.delete("all")
-        snake.clear()
-        snake.append((20, 20))
-        direction = "Right"
-        snake_rects.clear()
-        food_pos = None
-        score = 0
-        enemy_snake = [(5, 5), (5, 6)]
-        enemy_rects.clear()
-
-        draw_border()
-        draw_snake()
-        draw_enemy_snake()
-        spawn_food()
-        draw_scores()
-        move_snake()
+        game.stop_playback()
+        game.reset()
+        start_game()
 
     # Bind arrow keys
     window.bind("<KeyPress>", change_direction)
-    move_snake()
+    if replays:
+        game.start_playback(replays.pop(0))
+    start_game()
     window.mainloop()
-
-# === Enemy Snake Logic ===
-def move_enemy():
-    global enemy_snake, enemy_rects, food_pos, food_item
-
-    head = enemy_snake[0]
-    player_head = snake[0]
-
-    # Choose the closer target
-    target = food_pos if manhattan(head, food_pos) <= manhattan(head, player_head) else player_head
-
-    # Valid directions
-    options = [(head[0] + dx, head[1] + dy) for dx, dy in DIRECTIONS.values()]
-    valid = [
-        pos for pos in options
-        if BORDER_OFFSET <= pos[0] < GRID_WIDTH - BORDER_OFFSET and
-           BORDER_OFFSET <= pos[1] < GRID_HEIGHT - BORDER_OFFSET and
-           pos not in enemy_snake and
-           pos not in snake
-    ]
-
-    if not valid:
-        return
-
-    # 25% chance to act randomly
-    RANDOMNESS_PROBABILITY = 0.25
-    if random.random() < RANDOMNESS_PROBABILITY:
-        new_head = random.choice(valid)
-    else:
-        valid.sort(key=lambda pos: manhattan(pos, target))
-        new_head = valid[0]
-
-    # Food collision
-    if new_head == food_pos:
-        canvas.delete(food_item)
-        spawn_food()
-        enemy_snake.insert(0, new_head)
-        rect = canvas.create_rectangle(0, 0, 0, 0, fill="red", outline="")
-        enemy_rects.insert(0, rect)
-    else:
-        enemy_snake = [new_head] + enemy_snake[:-1]
-
-    # Update enemy graphics
-    for i, (x, y) in enumerate(enemy_snake):
-        canvas.coords(enemy_rects[i],
-                      x * CELL_SIZE, y * CELL_SIZE,
-                      (x + 1) * CELL_SIZE, (y + 1) * CELL_SIZE)
-
-# === Helper: Manhattan Distance ===
-def manhattan(a, b):
-    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+    loop.close()
 
 # === Draw Functions ===
-def draw_border():
+def draw_everything(game):
+    global snake_sprite, enemy_sprites
+    draw_border(game)
+    snake_sprite = SnakeSprite(game.snake, "lime", game.player_moved)
+    enemy_sprites = [SnakeSprite(enemy.body, enemy_color(i), enemy.moved) for i, enemy in enumerate(game.enemies)]
+    food_items.clear()
+    for pos in game.foods:
+        draw_food(pos)
+    draw_scores(game)
+
+def enemy_color(i):
+    return ENEMY_COLORS[i % len(ENEMY_COLORS)]
+
+def draw_border(game):
     border_colors = ["purple", "yellow", "green", "red"]
     border_spacing = 4
     for i, color in enumerate(border_colors):
         offset = i * border_spacing
         canvas.create_rectangle(
             offset, offset,
-            CELL_SIZE * GRID_WIDTH - offset,
-            CELL_SIZE * GRID_HEIGHT - offset,
+            CELL_SIZE * game.width - offset,
+            CELL_SIZE * game.height - offset,
             outline=color,
             width=2
         )
 
-def draw_snake():
-    for x, y in snake:
-        rect = canvas.create_rectangle(
-            x * CELL_SIZE, y * CELL_SIZE,
-            (x + 1) * CELL_SIZE, (y + 1) * CELL_SIZE,
-            fill="lime", outline=""
-        )
-        snake_rects.append(rect)
-
-def draw_enemy_snake():
-    for x, y in enemy_snake:
-        rect = canvas.create_rectangle(
-            x * CELL_SIZE, y * CELL_SIZE,
-            (x + 1) * CELL_SIZE, (y + 1) * CELL_SIZE,
-            fill="red", outline=""
-        )
-        enemy_rects.append(rect)
-
-def spawn_food():
-    global food_pos, food_symbol, food_item
-
-    min_pos = BORDER_OFFSET + 1
-    max_pos = GRID_WIDTH - BORDER_OFFSET - 2
-
-    while True:
-        pos = (random.randint(min_pos, max_pos), random.randint(min_pos, max_pos))
-        if pos not in snake and pos not in enemy_snake:
-            break
-
-    food_pos = pos
+def cell_box(pos):
+    x, y = pos
+    return (x * CELL_SIZE, y * CELL_SIZE, (x + 1) * CELL_SIZE, (y + 1) * CELL_SIZE)
+
+# The rectangles for one snake, in the same order as its body (head first).
+# A normal move only changes the two ends of a body, so the tail rectangle is
+# picked up and dropped on the new head: one canvas call per move however
+# long the snake is. Growing adds exactly one rectangle.
+class SnakeSprite:
+    def __init__(self, body, color, moved):
+        self.color = color
+        self.rects = deque(canvas.create_rectangle(*cell_box(pos), fill=color, outline="") for pos in body)
+        self.moved = moved         # The snake's move count as last drawn
+
+    def sync(self, body, moved):
+        # Every move put one new cell at the front of the body, so the moves
+        # since the last frame say how many to draw. Usually that's 1, or 0
+        # for a snake that didn't get to move, but catching up after a slow
+        # frame (or a fast replay) runs several ticks per frame.
+        new = min(moved - self.moved, len(body))
+        self.moved = moved
+
+        # Oldest new cell first, reusing tails while the body hasn't grown
+        spare_tails = len(self.rects) + new - len(body)
+        for i in range(new - 1, -1, -1):
+            if spare_tails > 0:
+                rect = self.rects.pop()
+                canvas.coords(rect, *cell_box(body[i]))
+                spare_tails -= 1
+            else:
+                rect = canvas.create_rectangle(*cell_box(body[i]), fill=self.color, outline="")
+            self.rects.appendleft(rect)
+
+def draw_food(pos):
     food_symbol = random.choice(symbols)
     x, y = pos
-    food_item = canvas.create_text(
+    food_items[pos] = canvas.create_text(
         x * CELL_SIZE + CELL_SIZE // 2,
         y * CELL_SIZE + CELL_SIZE // 2,
         text=food_symbol,
-        font=("Courier", 20, "bold"),
+        font=("Courier", max(6, CELL_SIZE), "bold"),
         fill="white"
     )
 
-def draw_scores():
+# Move an eaten food's item to where new food appeared instead of making a
+# new one
+def move_food(old_pos, pos):
+    food_item = food_items.pop(old_pos)
+    food_symbol = random.choice(symbols)
+    x, y = pos
+    canvas.coords(food_item, x * CELL_SIZE + CELL_SIZE // 2, y * CELL_SIZE + CELL_SIZE // 2)
+    canvas.itemconfig(food_item, text=food_symbol)
+    food_items[pos] = food_item
+
+def draw_scores(game):
     global score_text, top_score_text
     top_score_text = canvas.create_text(
         10, 10,
         anchor="nw",
-        text=f"Top Score: {top_score}",
+        text=f"Top Score: {game.top_score}",
         font=("Courier", 12, "bold"),
         fill="yellow"
     )
     score_text = canvas.create_text(
         10, 30,
         anchor="nw",
-        text=f"Score: {score}",
+        text=f"Score: {game.score}",
         font=("Courier", 14, "bold"),
         fill="white"
     )
 
+# Bring the canvas up to date with the engine. Only what changed since the
+# last call is touched.
+def render(game):
+    # Food was eaten: move its item to the new food and update the score
+    if food_items.keys() != game.foods:
+        eaten = [pos for pos in food_items if pos not in game.foods]
+        for pos in game.foods:
+            if pos not in food_items:
+                if eaten:
+                    move_food(eaten.pop(), pos)
+                else:
+                    draw_food(pos)
+        for pos in eaten:
+            canvas.delete(food_items.pop(pos))
+        canvas.itemconfig(score_text, text=f"Score: {game.score}")
+
+    snake_sprite.sync(game.snake, game.player_moved)
+    for sprite, enemy in zip(enemy_sprites, game.enemies):
+        sprite.sync(enemy.body, enemy.moved)
+
 # === Start the Game ===
-launch_window()
+# e.g.  python Snake.py --width 1000 --height 1000 --length 5000
+#       python Snake.py --headless 1000000 --seed 1
+#       python Snake.py --headless 100000 --record games.json
+#       python Snake.py --replay games.json --speed 4      (or --headless 1 to check and time it)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Snake Game")
+    parser.add_argument("--width", type=int, default=GRID_WIDTH, help="board width in cells")
+    parser.add_argument("--height", type=int, default=GRID_HEIGHT, help="board height in cells")
+    parser.add_argument("--cell", type=int, default=None, help="cell size in pixels (default: fit the board in ~800 px)")
+    parser.add_argument("--length", type=int, default=1, help="starting length of the player snake")
+    parser.add_argument("--seed", type=int, default=None, help="seed for the game's random numbers")
+    parser.add_argument("--enemy-ai", default="greedy",
+                        help="how the enemies pick their moves: one of %s, or a comma separated list handed out in turn" % ", ".join(sorted(ENEMY_AIS)))
+    parser.add_argument("--enemies", type=int, default=1, help="number of enemy snakes")
+    parser.add_argument("--food", type=int, default=1, help="number of food items on the board at once")
+    parser.add_argument("--headless", type=int, default=0, metavar="TICKS",
+                        help="run this many ticks with no window and print a summary")
+    parser.add_argument("--record", metavar="FILE", help="save a replay of every finished game to FILE")
+    parser.add_argument("--replay", metavar="FILE", help="play back the games in FILE")
+    parser.add_argument("--speed", type=float, default=1.0, help="playback speed multiplier for --replay")
+    parser.add_argument("--fps", type=int, default=60, help="frames drawn per second in the window")
+    parser.add_argument("--stats", action="store_true", help="show tick and frame timings in the window")
+    parser.add_argument("--stats-csv", metavar="FILE", help="write per-tick and per-frame timings to FILE")
+    args, _ = parser.parse_known_args()   # known_args so it still runs inside Jupyter
+    unknown = set(args.enemy_ai.split(",")) - set(ENEMY_AIS)
+    if unknown:
+        parser.error("unknown enemy AI: " + ", ".join(sorted(unknown)))
+
+    CELL_SIZE = args.cell or max(1, min(20, 800 // max(args.width, args.height)))
+    BORDER_OFFSET = 4 * 4 // CELL_SIZE
+    game = SnakeGame(args.width, args.height, BORDER_OFFSET, args.length, args.seed,
+                     args.enemy_ai.split(","), args.enemies, args.food)
+
+    replays = load_replays(args.replay) if args.replay else None
+    if replays and not args.headless:
+        game = game_for_replay(replays[0])
+
+    if args.headless:
+        recorded = []
+        if replays:
+            result = play_headless(replays)
+        else:
+            result = run_headless(game, args.headless, replays=recorded)
+        for key, value in result.items():
+            print(f"{key}: {value:.2f}" if isinstance(value, float) else f"{key}: {value}")
+        if args.record:
+            save_replays(args.record, recorded)
+    else:
+        launch_window(game, replays, args.speed, args.record, args.fps, args.stats, args.stats_csv)
 
 
 # In[ ]:
@@ -304,7 +411,3 @@ launch_window()
 
 
 # In[ ]:
-
-
-
-
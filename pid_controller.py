@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# PID controller for the car, plus an offline tuner.
+#
+# PID.update(error) works out dt itself from a monotonic clock, so a late
+# loop (sleep overshooting, a slow callback) doesn't throw the I and D terms
+# off the way assuming "every call is 20 ms" does. On top of plain PID it has:
+#   derivative_tau   low-pass on the derivative (seconds), so a sensor edge
+#                    doesn't turn into a spike on the steering
+#   integral_limit   clamp on the integral term, and no integrating while the
+#                    output is pinned at its limit (anti-windup)
+#   slew_rate        max output change per second
+#
+# The tuner runs the line follower against a simulated car (bicycle model with
+# a lagging steering servo, two on/off line sensors ahead of the rear axle and
+# a wavy line), so gains can be found at a given speed without the car:
+#   relay    Åström-Hägglund relay test: bang-bang steering makes the car
+#            weave, the weave period and size give Ziegler-Nichols gains
+#   grid     tries every combination of gains around a starting point and
+#            keeps the one with the least line error that never lost the line
+#
+#   python pid_controller.py --speed 1.0                 (relay, then grid around it)
+#   python pid_controller.py --speed 1 1.5 2 --method grid  (find how fast it can go)
+#   python pid_controller.py --check 4 0.5 0.2           (score given kp ki kd)
+
+import argparse
+import itertools
+import math
+import random
+import time
+
+class PID:
+    def __init__(self, kp, ki=0.0, kd=0.0, output_limits=(None, None), integral_limit=None,
+                 derivative_tau=0.0, slew_rate=None, clock=time.monotonic):
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.output_min, self.output_max = output_limits
+        self.integral_limit = integral_limit
+        self.derivative_tau = derivative_tau
+        self.slew_rate = slew_rate
+        self.clock = clock
+        self.reset()
+
+    def reset(self):
+        self.integral = 0.0
+        self.derivative = 0.0
+        self.previous_error = None
+        self.previous_time = None
+        self.output = 0.0
+
+    # now is only passed by simulations; on the car the clock is used
+    def update(self, error, now=None):
+        if now is None:
+            now = self.clock()
+        if self.previous_time is None:
+            dt = 0.0
+        else:
+            dt = now - self.previous_time
+
+        if dt > 0:
+            # Filtered derivative: first-order low-pass with time constant derivative_tau
+            raw = (error - self.previous_error) / dt
+            alpha = dt / (self.derivative_tau + dt)
+            self.derivative += alpha * (raw - self.derivative)
+
+            # Anti-windup: stop integrating while the output is pinned in the same direction
+            pinned_high = self.output_max is not None and self.output >= self.output_max and error > 0
+            pinned_low = self.output_min is not None and self.output <= self.output_min and error < 0
+            if not (pinned_high or pinned_low):
+                self.integral += self.ki * error * dt
+                if self.integral_limit is not None:
+                    self.integral = max(-self.integral_limit, min(self.integral_limit, self.integral))
+
+        output = self.kp * error + self.integral + self.kd * self.derivative
+        if self.output_max is not None:
+            output = min(self.output_max, output)
+        if self.output_min is not None:
+            output = max(self.output_min, output)
+        if self.slew_rate is not None and self.previous_time is not None:
+            step = self.slew_rate * dt
+            output = max(self.output - step, min(self.output + step, output))
+
+        self.previous_error = error
+        self.previous_time = now
+        self.output = output
+        return output
+
+# === SIMULATED CAR ===
+# Units: metres, seconds, radians. The controller output is the steering duty
+# cycle offset from 7.5 %, like in "Line following code"; +-2.5 is full lock.
+WHEELBASE = 0.26
+MAX_STEER = 0.45          # rad at full lock
+SERVO_TAU = 0.08          # s, steering servo lag
+SENSOR_AHEAD = 0.12       # m in front of the rear axle
+SENSOR_SPACING = 0.02     # m between the two sensors, both over the tape when centred
+LINE_WIDTH = 0.025        # m, wide electrical tape
+LOST_OFFSET = 0.15        # m off the line counts as lost
+FULL_LOCK_DUTY = 2.5
+ON_TAPE = 0               # What a line sensor reads over the tape (1 off it)
+
+CONTROL_HZ = 50
+PHYSICS_DT = 0.002
+
+# Steering error from the two sensor readings, as in "Line following code":
+# +1 when only the right sensor is off the tape, -1 when only the left one is.
+# With both off the line the error keeps pointing to the side the line was
+# last seen, at twice the size, instead of dropping to 0 and driving straight on.
+def sensor_error(left, right, last_error):
+    left_off, right_off = left != ON_TAPE, right != ON_TAPE
+    if left_off and right_off:
+        return 2 if last_error > 0 else -2 if last_error < 0 else 0
+    return int(right_off) - int(left_off)
+
+class Track:
+    # Straight for a bit, then a sine wave
+    def __init__(self, amplitude=0.3, wavelength=5.0, straight=1.0):
+        self.amplitude = amplitude
+        self.wavelength = wavelength
+        self.straight = straight
+
+    def line_y(self, x):
+        if x < self.straight:
+            return 0.0
+        return self.amplitude * math.sin(2 * math.pi * (x - self.straight) / self.wavelength)
+
+# Runs the car along the track with a fresh PID (or a relay of the given size
+# when controller is None). The controller is updated on
+# every sensor change and on a fixed tick with random lateness, like the real
+# loop. Returns (cost, stats): cost is the mean distance from the line, or 10+
+# if the line was lost.
+def simulate(controller, speed, duration=12.0, track=None, jitter=0.005, seed=0, relay=None, start_y=0.0):
+    track = track or Track()
+    rng = random.Random(seed)
+
+    x, y, heading, steer = 0.0, start_y, 0.0, 0.0
+    t = 0.0
+    next_tick = 0.0
+    sensors = (ON_TAPE, ON_TAPE)
+    error = 0
+    command = 0.0
+    total_offset = 0.0
+    steps = 0
+    crossings = []          # Times the car crossed the line (for the relay test)
+    peak = 0.0
+    last_side = 0
+
+    while t < duration:
+        # Each sensor reads ON_TAPE while it is over the tape
+        ahead_x = x + SENSOR_AHEAD * math.cos(heading)
+        ahead_y = y + SENSOR_AHEAD * math.sin(heading)
+        side_x = -math.sin(heading) * SENSOR_SPACING / 2
+        side_y = math.cos(heading) * SENSOR_SPACING / 2
+        left_on = abs(ahead_y + side_y - track.line_y(ahead_x + side_x)) < LINE_WIDTH / 2
+        right_on = abs(ahead_y - side_y - track.line_y(ahead_x - side_x)) < LINE_WIDTH / 2
+        reading = (ON_TAPE if left_on else 1 - ON_TAPE, ON_TAPE if right_on else 1 - ON_TAPE)
+        changed = reading != sensors
+        sensors = reading
+
+        if changed or t >= next_tick:
+            error = sensor_error(sensors[0], sensors[1], error)
+            if relay is not None:
+                # Bang-bang steering for the relay test, holding the last side seen
+                if error:
+                    command = relay if error > 0 else -relay
+            else:
+                command = controller.update(error, t)
+            if t >= next_tick:
+                next_tick += 1 / CONTROL_HZ + rng.uniform(0, jitter)
+
+        # Servo lag towards the commanded angle, then the bicycle model
+        target = max(-1.0, min(1.0, command / FULL_LOCK_DUTY)) * MAX_STEER
+        steer += (target - steer) * PHYSICS_DT / SERVO_TAU
+        x += speed * math.cos(heading) * PHYSICS_DT
+        y += speed * math.sin(heading) * PHYSICS_DT
+        heading += speed / WHEELBASE * math.tan(steer) * PHYSICS_DT
+        t += PHYSICS_DT
+
+        offset = y - track.line_y(x)
+        total_offset += abs(offset)
+        steps += 1
+        peak = max(peak, abs(offset))
+        side = 1 if offset > 0 else -1
+        if last_side and side != last_side:
+            crossings.append(t)
+        last_side = side
+        if abs(offset) > LOST_OFFSET:
+            return 10 + (duration - t), {"lost_at": round(t, 2), "peak": peak, "crossings": crossings}
+
+    return total_offset / steps, {"lost_at": None, "peak": peak, "crossings": crossings}
+
+# The steering PID as the line follower sets it up: output limited to full
+# lock, lock-to-lock in no less than 0.2 s
+def steering_pid(kp, ki, kd):
+    return PID(kp, ki, kd, output_limits=(-FULL_LOCK_DUTY, FULL_LOCK_DUTY),
+               integral_limit=FULL_LOCK_DUTY / 2, derivative_tau=0.03,
+               slew_rate=FULL_LOCK_DUTY * 10)
+
+# === TUNING ===
+# Relay test on a straight line, starting with the line under one sensor:
+# steering full lock one way or the other makes the car weave with period Tu.
+# The error swings by a = 1 (the sensors are on/off), so the ultimate gain is
+# Ku = 4d / (pi a) for relay size d.
+def relay_tune(speed, relay=FULL_LOCK_DUTY):
+    straight = Track(amplitude=0.0)
+    _, stats = simulate(None, speed, duration=8.0, track=straight, relay=relay, start_y=LINE_WIDTH / 2)
+    crossings = stats["crossings"][2:]     # Skip the start-up swing
+    if len(crossings) < 3:
+        return None
+    tu = 2 * (crossings[-1] - crossings[0]) / (len(crossings) - 1)
+    ku = 4 * relay / math.pi
+    gains = (0.6 * ku, 1.2 * ku / tu, 0.075 * ku * tu)     # Classic Ziegler-Nichols PID
+    return {"ku": ku, "tu": tu, "gains": gains}
+
+def grid_tune(speed, start, scales=(0.25, 0.5, 1.0, 2.0, 4.0), seeds=(0, 1)):
+    kp0, ki0, kd0 = start
+    best = None
+    for sp, si, sd in itertools.product(scales, (0.0,) + tuple(scales), scales):
+        gains = (kp0 * sp, ki0 * si, kd0 * sd)
+        cost = sum(simulate(steering_pid(*gains), speed, seed=s)[0] for s in seeds) / len(seeds)
+        if best is None or cost < best[0]:
+            best = (cost, gains)
+    return best
+
+def show(name, gains, speed):
+    cost, stats = simulate(steering_pid(*gains), speed)
+    state = f"lost the line at {stats['lost_at']} s" if stats["lost_at"] is not None else \
+        f"mean offset {cost * 100:.1f} cm, peak {stats['peak'] * 100:.1f} cm"
+    print(f"{name:>10}: kp {gains[0]:.3f}  ki {gains[1]:.3f}  kd {gains[2]:.3f}  -> {state}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PID tuning against a simulated line-following car")
+    parser.add_argument("--speed", type=float, nargs="+", default=[1.0], help="car speed(s) in m/s")
+    parser.add_argument("--method", choices=["relay", "grid", "both"], default="both")
+    parser.add_argument("--start", type=float, nargs=3, metavar=("KP", "KI", "KD"), default=[1.0, 0.5, 0.1],
+                        help="grid search centre when not starting from the relay result")
+    parser.add_argument("--check", type=float, nargs=3, metavar=("KP", "KI", "KD"), help="just score these gains")
+    args = parser.parse_args()
+
+    for speed in args.speed:
+        print(f"== {speed} m/s")
+        if args.check:
+            show("given", tuple(args.check), speed)
+            continue
+
+        start = tuple(args.start)
+        if args.method in ("relay", "both"):
+            result = relay_tune(speed)
+            if result is None:
+                print("relay test: the car didn't oscillate, can't tune from it")
+            else:
+                print(f"relay test: Ku {result['ku']:.2f}, Tu {result['tu']:.3f} s")
+                show("relay ZN", result["gains"], speed)
+                start = result["gains"]
+        if args.method in ("grid", "both"):
+            began = time.perf_counter()
+            cost, gains = grid_tune(speed, start)
+            show("grid best", gains, speed)
+            print(f"({time.perf_counter() - began:.0f} s of searching)")
@@ -0,0 +1,278 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Per-channel stick processing between the receiver and the ESC / servo.
+#
+# For every pulse, in order:
+#   1. glitch filter on the raw width   median of the last 3, or an EMA
+#   2. shaping lookup                   trim, reverse, expo, rate, end points
+#   3. rate limit                       at most `slew` µs/s of change (throttle)
+#   4. steering-throttle mix            less steering throw the faster we go
+#
+# Steps 2 and 4 are worked out for every possible input width when the config
+# is loaded, so at run time they are one array index each. Steps 1 and 3 keep
+# a little state per channel and cost a few integer operations.
+#
+# The lookup tables and the per-channel filter state live in one Tables object
+# that load() builds on the side and then swaps in with a single assignment.
+# pulse() grabs the current Tables once per call, so a reload can happen while
+# the pigpio callbacks are running and each pulse sees either the old config
+# and state or the new ones, never a mix. A reload with the same number of
+# channels carries the filter state over, so the outputs don't jump.
+# watch() reloads a JSON config file whenever it changes on disk.
+#
+# Config: {"channels": [{...}, ...], "steering_mix": 0.0}, one dict per
+# channel in receiver order (see DEFAULT_CONFIG for the keys). steering_mix is
+# the fraction of steering throw taken away at full throttle, and needs one
+# channel named "throttle" and one named "steering".
+#
+#   python rc_mixer.py --write-config mixer.json   (start from the defaults)
+#   python rc_mixer.py --simulate                  (check the pipeline on made-up pulses)
+
+import argparse
+import json
+import os
+import time
+from array import array
+
+from rc_receiver import MIN_PULSE_US, MAX_PULSE_US, NEUTRAL_US
+
+# === SETTINGS ===
+FRAME_US = 20000     # Time between pulses on one channel (50 Hz receivers)
+MIX_ROWS = 33        # Throttle positions the steering mix is worked out for
+LUT_SIZE = MAX_PULSE_US - MIN_PULSE_US + 1
+
+CHANNEL_DEFAULTS = {
+    "name": "",
+    "trim": 0,          # µs added to the centre
+    "reverse": False,
+    "expo": 0.0,        # 0 = linear, 1 = fully cubic (soft around centre)
+    "rate": 1.0,        # Throw around centre, like the old DAMPENING factor
+    "min": 1000,        # End points, after everything else
+    "max": 2000,
+    "filter": "none",   # "none", "median" (of 3) or "ema"
+    "ema_shift": 2,     # EMA weight of a new pulse is 1 / 2**ema_shift
+    "slew": 0,          # Max change in µs per second, 0 = no limit
+}
+
+DEFAULT_CONFIG = {
+    "channels": [
+        {"name": "throttle", "rate": 0.5, "filter": "median", "slew": 4000},
+        {"name": "steering", "expo": 0.3, "filter": "ema", "ema_shift": 1},
+    ],
+    "steering_mix": 0.4,
+}
+
+# Input width -> output width for one channel
+def shaping_lut(channel):
+    lut = array("H", [0] * LUT_SIZE)
+    centre = NEUTRAL_US + channel["trim"]
+    for i in range(LUT_SIZE):
+        x = max(-1.0, min(1.0, (MIN_PULSE_US + i - NEUTRAL_US) / 500))
+        if channel["reverse"]:
+            x = -x
+        x = (1 - channel["expo"]) * x + channel["expo"] * x ** 3
+        width = round(centre + 500 * x * channel["rate"])
+        lut[i] = max(channel["min"], min(channel["max"], width))
+    return lut
+
+# Flat (throttle row, steering width) table: row r scales steering throw by
+# 1 - mix * r / (MIX_ROWS - 1). Also returns throttle width -> row offset.
+def mix_luts(mix):
+    rows = array("I", [0] * LUT_SIZE)
+    for i in range(LUT_SIZE):
+        speed = min(1.0, abs(MIN_PULSE_US + i - NEUTRAL_US) / 500)
+        rows[i] = round(speed * (MIX_ROWS - 1)) * LUT_SIZE
+    table = array("H", [0] * (MIX_ROWS * LUT_SIZE))
+    for row in range(MIX_ROWS):
+        scale = 1 - mix * row / (MIX_ROWS - 1)
+        for i in range(LUT_SIZE):
+            table[row * LUT_SIZE + i] = round(NEUTRAL_US + (MIN_PULSE_US + i - NEUTRAL_US) * scale)
+    return rows, table
+
+class Tables:
+    def __init__(self, config):
+        channels = [dict(CHANNEL_DEFAULTS, **c) for c in config["channels"]]
+        for c in channels:
+            unknown = set(c) - set(CHANNEL_DEFAULTS)
+            if unknown:
+                raise ValueError(f"unknown channel setting: {', '.join(sorted(unknown))}")
+            if c["filter"] not in ("none", "median", "ema"):
+                raise ValueError(f"unknown filter: {c['filter']}")
+            c["min"] = max(MIN_PULSE_US, c["min"])   # Outputs must stay indexable by the mix table
+            c["max"] = min(MAX_PULSE_US, c["max"])
+        self.channels = channels
+        self.shape = [shaping_lut(c) for c in channels]
+        self.filter = [c["filter"] for c in channels]
+        self.ema_shift = [c["ema_shift"] for c in channels]
+        self.slew_step = [max(1, c["slew"] * FRAME_US // 1000000) if c["slew"] else 0 for c in channels]
+
+        names = [c["name"] for c in channels]
+        self.throttle = names.index("throttle") if "throttle" in names else -1
+        self.steering = names.index("steering") if "steering" in names else -1
+        mix = config.get("steering_mix", 0.0)
+        if mix and self.throttle >= 0 and self.steering >= 0:
+            self.mix_rows, self.mix = mix_luts(mix)
+        else:
+            self.mix_rows, self.mix = None, None
+
+        count = len(channels)
+        self.history = [None] * count     # Last raw widths, for the median
+        self.smoothed = [0] * count       # EMA state, 8 fractional bits
+        self.output = [0] * count         # 0 = nothing sent yet
+        self.reset()
+
+    # Filter state back to neutral with nothing sent yet
+    def reset(self):
+        for i in range(len(self.channels)):
+            self.history[i] = [NEUTRAL_US] * 3
+            self.smoothed[i] = NEUTRAL_US << 8
+            self.output[i] = 0
+
+class Mixer:
+    def __init__(self, config=DEFAULT_CONFIG):
+        self.path = None
+        self.mtime = None
+        self.load(config)
+
+    def load(self, config):
+        tables = Tables(config)
+        old = getattr(self, "tables", None)
+        if old is not None and len(old.channels) == len(tables.channels):
+            # Same channels: keep filtering where the old config left off
+            tables.history, tables.smoothed, tables.output = old.history, old.smoothed, old.output
+        self.tables = tables   # The swap: everything after this sees the new config and state
+
+    # Forget the filter state, e.g. after the receiver signal was lost, so the
+    # first pulses back don't replay (or slew down from) the old sticks
+    def reset(self):
+        self.tables.reset()
+
+    # Reload the config file if it changed since last time. A broken file is
+    # reported and the running config kept.
+    def watch(self, path):
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return False
+        if path == self.path and mtime == self.mtime:
+            return False
+        self.path, self.mtime = path, mtime
+        try:
+            with open(path) as f:
+                self.load(json.load(f))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"Kept the old mixer config, could not load {path}: {e}")
+            return False
+        return True
+
+    # Raw width in, width to send out. Out-of-range glitches repeat the last output.
+    def pulse(self, channel, width):
+        t = self.tables
+        if not MIN_PULSE_US <= width <= MAX_PULSE_US:
+            return t.output[channel] or NEUTRAL_US
+
+        kind = t.filter[channel]
+        if kind == "median":
+            h = t.history[channel]
+            h[0], h[1], h[2] = h[1], h[2], width
+            a, b, c = h
+            width = max(min(a, b), min(max(a, b), c))
+        elif kind == "ema":
+            s = t.smoothed[channel]
+            s += ((width << 8) - s) >> t.ema_shift[channel]
+            t.smoothed[channel] = s
+            width = (s + 128) >> 8
+
+        out = t.shape[channel][width - MIN_PULSE_US]
+
+        step = t.slew_step[channel]
+        last = t.output[channel]
+        if step and last:
+            out = max(last - step, min(last + step, out))
+
+        t.output[channel] = out
+        if channel == t.steering and t.mix is not None:
+            throttle = t.output[t.throttle] or NEUTRAL_US
+            return t.mix[t.mix_rows[throttle - MIN_PULSE_US] + out - MIN_PULSE_US]
+        return out
+
+# === SIMULATED CHECKS ===
+def run_simulation():
+    ok = True
+    def check(name, good, detail):
+        nonlocal ok
+        ok = ok and good
+        print(f"{'ok  ' if good else 'FAIL'} {name}: {detail}")
+
+    mixer = Mixer()
+    throttle, steering = 0, 1
+
+    # Median of 3 drops a single spike on throttle
+    outs = [mixer.pulse(throttle, w) for w in (1500, 1500, 1900, 1500, 1500)]
+    check("median drops a one-pulse spike", max(outs) == 1500, outs)
+
+    # Throttle slew: full stick takes 80 µs steps to the rate-limited end (the
+    # first pulse is still inside the median window)
+    outs = [mixer.pulse(throttle, 2000) for _ in range(5)]
+    check("throttle slew 80 µs per pulse", outs == [1500, 1580, 1660, 1740, 1750], outs)
+
+    # Out-of-range pulse repeats the last output
+    check("glitch holds last output", mixer.pulse(throttle, 3000) == 1750, mixer.pulse(throttle, 3000))
+
+    # Steering throw is reduced at speed (throttle is at 1750 = half speed)
+    for _ in range(20):
+        out = mixer.pulse(steering, 2000)
+    check("steering mixed down at half throttle", out == 1900, out)
+
+    # Hot reload: new rate on throttle, filter state carried over
+    mixer.load({"channels": [{"name": "throttle", "rate": 1.0}, {"name": "steering"}], "steering_mix": 0})
+    outs = [mixer.pulse(throttle, 2000), mixer.pulse(steering, 2000)]
+    check("reloaded config takes effect on the next pulse", outs == [2000, 2000], outs)
+
+    # Bad config is refused and the old one kept
+    try:
+        mixer.load({"channels": [{"name": "throttle", "expoo": 1}]})
+        check("bad config refused", False, "loaded")
+    except ValueError as e:
+        check("bad config refused", mixer.pulse(throttle, 2000) == 2000, e)
+
+    # A reload with the same channels keeps the filter state: throttle slews on from 2000
+    mixer.load({"channels": [{"name": "throttle", "slew": 4000}, {"name": "steering"}]})
+    outs = [mixer.pulse(throttle, 1000) for _ in range(2)]
+    check("reload carries the filter state over", outs == [1920, 1840], outs)
+
+    # A config path that can't be opened is reported, not raised
+    check("unreadable config kept out", mixer.watch(os.path.dirname(os.path.abspath(__file__))) is False, "")
+
+    # After a failsafe reset the throttle comes back at the new stick, not
+    # ramping down from where it was
+    mixer = Mixer()
+    for _ in range(20):
+        mixer.pulse(throttle, 2000)
+    mixer.reset()
+    outs = [mixer.pulse(throttle, 1500) for _ in range(3)]
+    check("reset drops the old throttle", outs == [1500, 1500, 1500], outs)
+
+    mixer = Mixer()
+    widths = [1000 + (i * 37) % 1000 for i in range(20000)]
+    start = time.perf_counter()
+    for i, w in enumerate(widths):
+        mixer.pulse(i & 1, w)
+    print(f"     {(time.perf_counter() - start) / len(widths) * 1e6:.2f} µs per pulse")
+
+    print("all simulated checks passed" if ok else "SOME SIMULATED CHECKS FAILED")
+    return ok
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="RC channel mixer")
+    parser.add_argument("--write-config", metavar="FILE", help="write the default config as JSON")
+    parser.add_argument("--simulate", action="store_true", help="check the pipeline on simulated pulses")
+    args = parser.parse_args()
+
+    if args.write_config:
+        with open(args.write_config, "w") as f:
+            json.dump(DEFAULT_CONFIG, f, indent=2)
+        print("wrote", args.write_config)
+    if args.simulate or not args.write_config:
+        raise SystemExit(0 if run_simulation() else 1)
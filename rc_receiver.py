@@ -0,0 +1,501 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# RC receiver decoding for the Pi.
+#
+# Captures the sticks from the receiver into a ChannelTable, from any of:
+#   PWM   one pin per channel, pulse width = high time          (PWMDecoder)
+#   PPM   every channel on one pin, width = rising-to-rising    (PPMDecoder)
+#   SBUS  16 channels in 25-byte serial frames, 100000 8E2      (SBUSDecoder)
+#
+# The channel table is plain arrays: a width in µs and the pigpio tick it
+# arrived at, per channel. The decoder is the only writer and it only ever
+# stores whole numbers into array slots, so readers never need a lock. A reader
+# that wants a whole PPM/SBUS frame at once uses snapshot(), which retries if a
+# frame was being written while it read (a sequence counter, like a seqlock).
+#
+# Channels older than the failsafe timeout (or never seen) read as their
+# failsafe width instead of the last value, so a dropped receiver brings the
+# car back to neutral.
+#
+# PWM and PPM pins are hooked up with pi.callback. The pigpio library serves
+# every callback from its one notification thread and socket, so extra
+# channels only add a bit to the notify mask - no extra threads or command
+# round trips.
+#
+# Nothing here needs the hardware to be tested: SimulatedPi takes the place of
+# pigpio.pi() and replays edge streams built by pwm_edges() / ppm_edges(), and
+# sbus_frame() builds SBUS bytes.
+#   python rc_receiver.py --simulate           (decode checks against simulated streams)
+#   python rc_receiver.py --pwm 23,24          (live: throttle and steering pins)
+#   python rc_receiver.py --ppm 23
+#   python rc_receiver.py --sbus /dev/serial0
+
+import argparse
+import time
+from array import array
+
+try:
+    import pigpio
+except ImportError:
+    pigpio = None   # Only needed for live capture; the simulator runs without it
+
+# === SETTINGS ===
+NEUTRAL_US = 1500
+MIN_PULSE_US = 800            # Anything outside this is a glitch, not a stick position
+MAX_PULSE_US = 2200
+FAILSAFE_TIMEOUT_US = 100000  # A channel this old reads as its failsafe width
+PPM_SYNC_US = 3000            # A gap longer than this starts a new PPM frame
+TICK_MASK = 0xFFFFFFFF        # pigpio ticks are 32-bit µs and wrap every ~72 minutes
+
+# Same values as pigpio.INPUT and pigpio.EITHER_EDGE
+INPUT = 0
+EITHER_EDGE = 2
+
+# SBUS frame layout
+SBUS_FRAME_LEN = 25
+SBUS_HEADER = 0x0F
+SBUS_FOOTERS = (0x00, 0x04, 0x14, 0x24, 0x34)   # SBUS and SBUS2 end bytes
+SBUS_CHANNELS = 16
+SBUS_FRAME_LOST = 1 << 2
+SBUS_FAILSAFE = 1 << 3
+
+def tick_diff(start, end):
+    return (end - start) & TICK_MASK
+
+# === CHANNEL TABLE ===
+class ChannelTable:
+    def __init__(self, count, timeout_us=FAILSAFE_TIMEOUT_US, failsafe=NEUTRAL_US):
+        self.count = count
+        self.timeout_us = timeout_us
+        self.width = array("H", [0] * count)           # µs, 0 = no signal
+        self.tick = array("I", [0] * count)            # pigpio tick of the last update
+        self.failsafe = array("H", [failsafe] * count)
+        self.seq = array("I", [0])                     # odd while a frame is being written
+        self.frames = 0
+
+    # One channel (PWM)
+    def write(self, channel, width, tick):
+        self.width[channel] = width
+        self.tick[channel] = tick
+
+    # Several channels that belong together (PPM / SBUS frame)
+    def write_frame(self, widths, tick, count=None):
+        count = self.count if count is None else min(count, self.count)
+        seq = self.seq[0]
+        self.seq[0] = (seq + 1) & TICK_MASK
+        for channel in range(count):
+            self.width[channel] = widths[channel]
+            self.tick[channel] = tick
+        self.seq[0] = (seq + 2) & TICK_MASK
+        self.frames += 1
+
+    # Drop every channel to no signal, e.g. when the receiver reports failsafe
+    def clear(self):
+        seq = self.seq[0]
+        self.seq[0] = (seq + 1) & TICK_MASK
+        for channel in range(self.count):
+            self.width[channel] = 0
+        self.seq[0] = (seq + 2) & TICK_MASK
+
+    def age(self, channel, now):
+        return tick_diff(self.tick[channel], now)
+
+    def valid(self, channel, now):
+        return self.width[channel] != 0 and self.age(channel, now) <= self.timeout_us
+
+    # Width to act on: the last pulse, or the failsafe width if it's stale
+    def read(self, channel, now):
+        width = self.width[channel]
+        if width == 0 or tick_diff(self.tick[channel], now) > self.timeout_us:
+            return self.failsafe[channel]
+        return width
+
+    # Every channel, all from the same frame
+    def snapshot(self, now):
+        while True:
+            seq = self.seq[0]
+            if seq & 1:
+                continue
+            values = [self.read(channel, now) for channel in range(self.count)]
+            if self.seq[0] == seq:
+                return values
+
+    def lost(self, now):
+        return not all(self.valid(channel, now) for channel in range(self.count))
+
+# === DECODERS ===
+# Each decoder has edge(gpio, level, tick), the pi.callback signature, so it can
+# be handed straight to pigpio or to SimulatedPi.
+
+class PWMDecoder:
+    # gpios[i] feeds channel i. on_pulse(channel, width, tick), if given, is
+    # called after each good pulse is stored, for code that reacts per pulse.
+    def __init__(self, table, gpios, on_pulse=None):
+        self.table = table
+        self.on_pulse = on_pulse
+        self.gpios = list(gpios)
+        self.channel = {gpio: i for i, gpio in enumerate(self.gpios)}
+        self.rise = array("I", [0] * len(self.gpios))
+        self.high = bytearray(len(self.gpios))   # Saw the rising edge of the current pulse
+        self.glitches = 0
+
+    def edge(self, gpio, level, tick):
+        channel = self.channel[gpio]
+        if level == 1:
+            self.rise[channel] = tick
+            self.high[channel] = 1
+        elif level == 0 and self.high[channel]:
+            self.high[channel] = 0
+            width = tick_diff(self.rise[channel], tick)
+            if MIN_PULSE_US <= width <= MAX_PULSE_US:
+                self.table.write(channel, width, tick)
+                if self.on_pulse:
+                    self.on_pulse(channel, width, tick)
+            else:
+                self.glitches += 1
+
+class PPMDecoder:
+    def __init__(self, table, gpio, sync_us=PPM_SYNC_US):
+        self.table = table
+        self.gpios = [gpio]
+        self.sync_us = sync_us
+        self.frame = array("H", [0] * table.count)
+        self.index = -1        # Channel the next gap belongs to, -1 = waiting for sync
+        self.last_rise = None
+        self.glitches = 0
+
+    def edge(self, gpio, level, tick):
+        if level != 1:
+            return
+        if self.last_rise is not None:
+            gap = tick_diff(self.last_rise, tick)
+            if gap >= self.sync_us:
+                # A short frame (fewer channels than the table) is published at the sync gap
+                if 0 < self.index < self.table.count:
+                    self.table.write_frame(self.frame, tick, self.index)
+                self.index = 0
+            elif self.index >= 0:
+                if not MIN_PULSE_US <= gap <= MAX_PULSE_US:
+                    self.glitches += 1
+                    self.index = -1   # Lost count of channels, wait for the next sync
+                elif self.index < self.table.count:
+                    self.frame[self.index] = gap
+                    self.index += 1
+                    if self.index == self.table.count:
+                        self.table.write_frame(self.frame, tick)
+                        self.index = self.table.count + 1   # Ignore extra channels until the sync
+        self.last_rise = tick
+
+# SBUS channels are 11-bit, 172..1811 for full travel. Mapped to the same µs
+# scale as PWM so the rest of the car doesn't care where the sticks came from.
+def sbus_to_us(raw):
+    return 1500 + ((raw - 992) * 5 + 4) // 8
+
+def us_to_sbus(width):
+    return max(0, min(2047, 992 + ((width - 1500) * 8 + 2) // 5))
+
+class SBUSDecoder:
+    def __init__(self, table):
+        self.table = table
+        self.buffer = bytearray()
+        self.frame = array("H", [0] * SBUS_CHANNELS)
+        self.lost_frames = 0
+        self.failsafes = 0
+        self.bad_bytes = 0
+
+    # Bytes as they come off the UART, in any chunk size
+    def feed(self, data, tick):
+        buffer = self.buffer
+        buffer += data
+        while len(buffer) >= SBUS_FRAME_LEN:
+            if buffer[0] != SBUS_HEADER or buffer[SBUS_FRAME_LEN - 1] not in SBUS_FOOTERS:
+                # Out of step with the frames: slide to the next possible header
+                start = buffer.find(SBUS_HEADER, 1)
+                skip = start if start > 0 else len(buffer)
+                self.bad_bytes += skip
+                del buffer[:skip]
+                continue
+            self.decode(buffer[:SBUS_FRAME_LEN], tick)
+            del buffer[:SBUS_FRAME_LEN]
+
+    def decode(self, frame, tick):
+        flags = frame[23]
+        if flags & SBUS_FAILSAFE:
+            self.failsafes += 1
+            self.table.clear()
+            return
+        if flags & SBUS_FRAME_LOST:
+            self.lost_frames += 1
+        bits = int.from_bytes(frame[1:23], "little")
+        for channel in range(SBUS_CHANNELS):
+            self.frame[channel] = sbus_to_us((bits >> (11 * channel)) & 0x7FF)
+        self.table.write_frame(self.frame, tick)
+
+# === HARDWARE ===
+# Register a PWM or PPM decoder's pins with pigpio. Returns the callbacks so
+# they can be cancelled.
+def attach(pi, decoder):
+    callbacks = []
+    for gpio in decoder.gpios:
+        pi.set_mode(gpio, INPUT)
+        callbacks.append(pi.callback(gpio, EITHER_EDGE, decoder.edge))
+    return callbacks
+
+# The daemon's tick counter, estimated locally so reading the table doesn't
+# cost a socket round-trip. Call sync() now and then to follow clock drift.
+class TickClock:
+    def __init__(self, pi):
+        self.pi = pi
+        self.sync()
+
+    def sync(self):
+        before = time.perf_counter_ns() // 1000
+        tick = self.pi.get_current_tick()
+        after = time.perf_counter_ns() // 1000
+        self.offset = (before + after) // 2 - tick
+
+    def now(self):
+        return (time.perf_counter_ns() // 1000 - self.offset) & TICK_MASK
+
+# Same interface as TickClock but from perf_counter alone, for SBUS when the
+# pigpio daemon isn't running. The ticks only have to agree with each other,
+# since SBUS doesn't mix them with pigpio's edge ticks.
+class PerfClock:
+    def sync(self):
+        pass
+
+    def now(self):
+        return (time.perf_counter_ns() // 1000) & TICK_MASK
+
+# SBUS comes in on the UART (through an inverter) rather than through pigpio.
+# Blocks, feeding the decoder, until stop() returns True.
+def read_sbus(port, decoder, clock, stop=lambda: False):
+    import serial   # pyserial, only needed for SBUS
+    with serial.Serial(port, 100000, parity=serial.PARITY_EVEN,
+                       stopbits=serial.STOPBITS_TWO, timeout=0.01) as uart:
+        while not stop():
+            data = uart.read(SBUS_FRAME_LEN)
+            if data:
+                decoder.feed(data, clock.now())
+
+# === SIMULATOR ===
+# Stands in for pigpio.pi(): callbacks registered on it get the edges passed
+# to play(), in tick order, and get_current_tick() follows the last edge.
+class SimulatedPi:
+    connected = True
+
+    def __init__(self, start_tick=0):
+        self.tick = start_tick & TICK_MASK
+        self.callbacks = []
+
+    def set_mode(self, gpio, mode):
+        pass
+
+    def get_current_tick(self):
+        return self.tick
+
+    def callback(self, gpio, edge, func):
+        cb = SimulatedCallback(self, gpio, func)
+        self.callbacks.append(cb)
+        return cb
+
+    # edges: (tick, gpio, level) in time order; ticks may run past 32 bits
+    def play(self, edges):
+        for tick, gpio, level in edges:
+            self.tick = tick & TICK_MASK
+            for cb in self.callbacks:
+                if cb.gpio == gpio:
+                    cb.func(gpio, level, self.tick)
+
+    def advance(self, us):
+        self.tick = (self.tick + us) & TICK_MASK
+
+    def stop(self):
+        self.callbacks = []
+
+class SimulatedCallback:
+    def __init__(self, pi, gpio, func):
+        self.pi = pi
+        self.gpio = gpio
+        self.func = func
+
+    def cancel(self):
+        if self in self.pi.callbacks:
+            self.pi.callbacks.remove(self)
+
+# One PWM pulse per frame per pin. widths[pin] is a list of pulse widths; all
+# pins start their pulse at the same time each period, as most receivers do.
+def pwm_edges(widths, start_tick=0, period=20000):
+    edges = []
+    frames = max(len(w) for w in widths.values())
+    for frame in range(frames):
+        t = start_tick + frame * period
+        for gpio, pulses in widths.items():
+            if frame < len(pulses):
+                edges.append((t, gpio, 1))
+                edges.append((t + pulses[frame], gpio, 0))
+    edges.sort()
+    return edges
+
+# PPM: a fixed-length pulse starts each channel, the time between rising edges
+# is the channel width, and each frame ends with a long sync gap.
+def ppm_edges(gpio, frames, start_tick=0, frame_len=22500, pulse=300):
+    edges = []
+    t = start_tick
+    for widths in frames:
+        frame_start = t
+        for width in list(widths) + [None]:
+            edges.append((t, gpio, 1))
+            edges.append((t + pulse, gpio, 0))
+            if width is not None:
+                t += width
+        t = max(frame_start + frame_len, t + PPM_SYNC_US + 500)
+    return edges
+
+def sbus_frame(widths, failsafe=False, frame_lost=False):
+    bits = 0
+    for channel, width in enumerate(widths[:SBUS_CHANNELS]):
+        bits |= us_to_sbus(width) << (11 * channel)
+    flags = (SBUS_FAILSAFE if failsafe else 0) | (SBUS_FRAME_LOST if frame_lost else 0)
+    return bytes([SBUS_HEADER]) + bits.to_bytes(22, "little") + bytes([flags, 0x00])
+
+# === SIMULATED CHECKS ===
+def check(name, got, expected):
+    status = "ok  " if got == expected else "FAIL"
+    print(f"{status} {name}: {got}" + ("" if got == expected else f" (expected {expected})"))
+    return got == expected
+
+def run_simulation():
+    results = []
+
+    # PWM on two pins, starting just before the tick counter wraps
+    pi = SimulatedPi()
+    table = ChannelTable(2)
+    decoder = PWMDecoder(table, [23, 24])
+    attach(pi, decoder)
+    start = TICK_MASK - 30000
+    pi.play(pwm_edges({23: [1500, 1600, 1700], 24: [1000, 1100, 2000]}, start))
+    results.append(check("PWM across tick wrap", table.snapshot(pi.tick), [1700, 2000]))
+
+    # A glitch (a 50 µs spike) is dropped and the last good width kept
+    pi.play(pwm_edges({23: [50]}, start + 60000))
+    results.append(check("PWM glitch rejected", (table.read(0, pi.tick), decoder.glitches), (1700, 1)))
+
+    # Channels go to failsafe once they stop updating
+    pi.advance(FAILSAFE_TIMEOUT_US + 1)
+    results.append(check("PWM failsafe", (table.snapshot(pi.tick), table.lost(pi.tick)), ([1500, 1500], True)))
+
+    # PPM, 8 channels, starting mid-frame so the first partial frame is skipped
+    pi = SimulatedPi()
+    table = ChannelTable(8)
+    decoder = PPMDecoder(table, 18)
+    attach(pi, decoder)
+    frames = [[1000 + 100 * c + f for c in range(8)] for f in range(4)]
+    pi.play(ppm_edges(18, frames)[6:])
+    results.append(check("PPM frame", table.snapshot(pi.tick), frames[-1]))
+    results.append(check("PPM frames decoded", table.frames, 3))
+
+    # PPM from a 6 channel transmitter into an 8 channel table
+    table = ChannelTable(8)
+    decoder = PPMDecoder(table, 18)
+    pi = SimulatedPi()
+    attach(pi, decoder)
+    pi.play(ppm_edges(18, [[1200] * 6, [1300] * 6, [1400] * 6]))
+    results.append(check("PPM short frame", table.snapshot(pi.tick), [1300] * 6 + [1500, 1500]))
+
+    # SBUS, split into odd chunk sizes with some line noise in front
+    table = ChannelTable(SBUS_CHANNELS)
+    decoder = SBUSDecoder(table)
+    widths = [1000 + 60 * c for c in range(SBUS_CHANNELS)]
+    stream = b"\x55\x0f\x01" + sbus_frame([1500] * SBUS_CHANNELS) + sbus_frame(widths)
+    for i in range(0, len(stream), 7):
+        decoder.feed(stream[i:i + 7], 1000)
+    got = table.snapshot(1000)
+    results.append(check("SBUS frame (within 1 µs)", all(abs(a - b) <= 1 for a, b in zip(got, widths)), True))
+    results.append(check("SBUS frames decoded", table.frames, 2))
+
+    # The receiver's own failsafe flag sends everything to failsafe straight away
+    decoder.feed(sbus_frame(widths, failsafe=True), 2000)
+    results.append(check("SBUS failsafe flag", table.snapshot(2000), [NEUTRAL_US] * SBUS_CHANNELS))
+
+    # Decode cost per edge
+    pi = SimulatedPi()
+    table = ChannelTable(4)
+    decoder = PWMDecoder(table, [5, 6, 12, 13])
+    attach(pi, decoder)
+    edges = pwm_edges({g: [1500 + (i % 50) for i in range(5000)] for g in (5, 6, 12, 13)})
+    start = time.perf_counter()
+    for tick, gpio, level in edges:
+        decoder.edge(gpio, level, tick)
+    per_edge = (time.perf_counter() - start) / len(edges) * 1e6
+    print(f"     PWM decode: {per_edge:.2f} µs per edge")
+
+    print("all simulated checks passed" if all(results) else "SOME SIMULATED CHECKS FAILED")
+    return all(results)
+
+# === LIVE ===
+def gpio_list(text):
+    return [int(g) for g in text.split(",")]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="RC receiver decoder")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--simulate", action="store_true", help="run the decoders against simulated edge streams")
+    source.add_argument("--pwm", type=gpio_list, metavar="GPIOS", help="one PWM input pin per channel, e.g. 23,24")
+    source.add_argument("--ppm", type=int, metavar="GPIO", help="PPM input pin")
+    source.add_argument("--sbus", metavar="PORT", help="SBUS serial port, e.g. /dev/serial0")
+    parser.add_argument("--channels", type=int, default=8, help="PPM channel count")
+    parser.add_argument("--timeout", type=int, default=FAILSAFE_TIMEOUT_US, help="failsafe timeout in µs")
+    args = parser.parse_args()
+
+    if args.simulate:
+        raise SystemExit(0 if run_simulation() else 1)
+
+    pi = pigpio.pi() if pigpio is not None else None
+    if pi is not None and pi.connected:
+        clock = TickClock(pi)
+    elif args.sbus:
+        clock = PerfClock()   # SBUS reads the UART, it only needed pigpio for the clock
+        pi = None
+    else:
+        print("Could not connect to pigpio daemon!")
+        exit()
+
+    callbacks = []
+    if args.pwm:
+        table = ChannelTable(len(args.pwm), args.timeout)
+        callbacks = attach(pi, PWMDecoder(table, args.pwm))
+    elif args.ppm is not None:
+        table = ChannelTable(args.channels, args.timeout)
+        callbacks = attach(pi, PPMDecoder(table, args.ppm))
+    else:
+        import threading
+        table = ChannelTable(SBUS_CHANNELS, args.timeout)
+        stopping = threading.Event()
+        reader = threading.Thread(target=read_sbus, args=(args.sbus, SBUSDecoder(table), clock, stopping.is_set),
+                                  daemon=True)
+        reader.start()
+
+    print("Reading receiver. Press Ctrl+C to stop.")
+    last_sync = time.monotonic()
+    try:
+        while True:
+            if time.monotonic() - last_sync >= 1.0:
+                clock.sync()
+                last_sync = time.monotonic()
+            now = clock.now()
+            values = table.snapshot(now)
+            status = "FAILSAFE" if table.lost(now) else "ok"
+            print(" ".join(f"{v:4d}" for v in values), status)
+            time.sleep(0.1)
+    except KeyboardInterrupt:
+        pass
+
+    # Cleanup
+    for cb in callbacks:
+        cb.cancel()
+    if args.sbus:
+        stopping.set()
+    if pi is not None:
+        pi.stop()
@@ -0,0 +1,280 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Benchmarks for the Snake engine in snake_engine.py.
+#
+# Runs SnakeGame headlessly (no Tk) over a set of cases and reports, per case:
+#   ticks/s, p50 / p99 tick latency, the time spent in move_snake,
+#   move_enemies and spawn_food per tick, and peak memory (tracemalloc).
+#
+# By default each dimension is swept on its own around a base case:
+#   board size   40x40 .. 2000x2000
+#   body length  1 .. 100000          (1000x1000 board)
+#   enemies      1 .. 50              (200x200 board)
+#   enemy AI     greedy / bfs / astar (200x200 board, 10 enemies)
+# --full runs every combination of --sizes/--lengths/--enemies/--ai instead.
+#
+# Every case is run --repeat times and the fastest run is kept, which shrugs
+# off the odd slow run from the machine being busy elsewhere. Against a
+# baseline, a case that still looks slower gets up to CONFIRM_ROUNDS more
+# goes before it counts as a regression.
+#
+# Results can be written as JSON or CSV, and compared against an earlier JSON
+# run with --baseline: any case whose ticks/s or p50 tick latency got worse
+# than --tolerance allows is reported and the exit code is 1, so a regression
+# in move_snake, move_enemies or spawn_food shows up. p99 is only reported,
+# not compared: on the slow cases it comes from a few dozen ticks and jumps
+# around from run to run.
+#
+# --replays adds one more row, the playback of a file of recorded games,
+# keyed by the file name, so it is saved and compared like the other cases.
+#
+# e.g.  python snake_bench.py --json bench.json
+#       python snake_bench.py --baseline bench.json
+#       python snake_bench.py --replays games.json      (time playback of recorded games)
+
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import snake_engine
+
+SWEEP_BASE = {"size": 200, "length": 1, "enemies": 1, "ai": "greedy"}
+LENGTH_SWEEP_SIZE = 1000   # big enough for the longest default body
+CONFIRM_ROUNDS = 2         # extra --repeat rounds for a case that looks regressed
+
+# The player steers with snake_engine.greedy_player and a new game starts whenever it
+# dies. Game resets are timed separately, not counted as ticks.
+def run_case(size, length, enemies, ai, ticks, seed, breakdown=True):
+    border = 0
+    game = snake_engine.SnakeGame(size, size, border, length, seed, ai, enemies)
+
+    # Time the three hot spots by wrapping them on this instance only
+    spent = {"move_snake": 0.0, "move_enemies": 0.0, "spawn_food": 0.0}
+    if breakdown:
+        for name in spent:
+            setattr(game, name, timed(getattr(game, name), spent, name))
+
+    latencies = []
+    reset_seconds = 0.0
+    games = 1
+    start = time.perf_counter()
+    for _ in range(ticks):
+        t0 = time.perf_counter()
+        game.change_direction(snake_engine.greedy_player(game))
+        alive = game.step()
+        latencies.append(time.perf_counter() - t0)
+        if not alive:
+            t1 = time.perf_counter()
+            food_before = spent["spawn_food"]
+            game.reset()
+            spent["spawn_food"] = food_before   # reset() places food too, that's reset time
+            reset_seconds += time.perf_counter() - t1
+            games += 1
+    elapsed = time.perf_counter() - start - reset_seconds
+
+    latencies.sort()
+    return {
+        "size": size, "length": length, "enemies": enemies, "ai": ai, "ticks": ticks,
+        "ticks_per_second": round(ticks / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2] * 1000, 4),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 4),
+        "move_snake_us": round(spent["move_snake"] / ticks * 1e6, 2),
+        "move_enemies_us": round(spent["move_enemies"] / ticks * 1e6, 2),
+        "spawn_food_us": round(spent["spawn_food"] / ticks * 1e6, 2),
+        "games": games,
+        "reset_ms": round(reset_seconds / max(1, games - 1) * 1000, 2) if games > 1 else 0.0,
+    }
+
+# Headless playback of recorded games, as a result row. The case is the file
+# name, with "replays" in place of the board size.
+def run_replays(path):
+    replays = snake_engine.load_replays(path)
+    latencies = []
+    start = time.perf_counter()
+    for replay in replays:
+        game = snake_engine.game_for_replay(replay)
+        game.start_playback(replay)
+        alive = True
+        while alive:
+            t0 = time.perf_counter()
+            alive = game.step()
+            latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    ticks = len(latencies)
+    return {
+        "size": "replays", "length": os.path.basename(path), "enemies": "", "ai": "", "ticks": ticks,
+        "ticks_per_second": round(ticks / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(latencies[ticks // 2] * 1000, 4) if ticks else 0.0,
+        "p99_ms": round(latencies[min(ticks - 1, int(ticks * 0.99))] * 1000, 4) if ticks else 0.0,
+        "games": len(replays),
+    }
+
+# Run a case `repeat` times (on top of an earlier result, if given) and keep
+# the fastest run, with the lowest p50 seen in any of them
+def best_of(repeat, run, previous=None):
+    results = [run() for _ in range(repeat)]
+    if previous is not None:
+        results.append(previous)
+    best = dict(max(results, key=lambda r: r["ticks_per_second"]))
+    best["p50_ms"] = min(r["p50_ms"] for r in results)
+    best["runs"] = sum(r.get("runs", 1) for r in results)
+    if previous is not None and "peak_mb" in previous:
+        best["peak_mb"] = previous["peak_mb"]
+    return best
+
+def timed(fn, spent, name):
+    def wrapper(*args):
+        start = time.perf_counter()
+        result = fn(*args)
+        spent[name] += time.perf_counter() - start
+        return result
+    return wrapper
+
+# Peak memory of building the game and playing a few ticks. Done as its own
+# short run because tracemalloc slows everything down.
+def peak_memory_mb(size, length, enemies, ai, ticks, seed):
+    tracemalloc.start()
+    game = snake_engine.SnakeGame(size, size, 0, length, seed, ai, enemies)
+    for _ in range(ticks):
+        game.change_direction(snake_engine.greedy_player(game))
+        if not game.step():
+            game.reset()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return round(peak / 2 ** 20, 2)
+
+def case_key(result):
+    return (result["size"], result["length"], result["enemies"], result["ai"])
+
+def case_name(result):
+    if result["size"] == "replays":
+        return f"replays {result['length']}"
+    return (f"{result['size']}x{result['size']} length={result['length']} "
+            f"enemies={result['enemies']} ai={result['ai']}")
+
+# Which cases to run: one dimension at a time around SWEEP_BASE, or the full
+# cartesian product. Lengths that don't fit on half the board are skipped.
+def plan_cases(args):
+    if args.full:
+        cases = itertools.product(args.sizes, args.lengths, args.enemies, args.ai)
+    else:
+        cases = []
+        base = SWEEP_BASE
+        cases += [(size, base["length"], base["enemies"], base["ai"]) for size in args.sizes]
+        cases += [(LENGTH_SWEEP_SIZE, length, base["enemies"], base["ai"]) for length in args.lengths]
+        cases += [(base["size"], base["length"], enemies, base["ai"]) for enemies in args.enemies]
+        cases += [(base["size"], base["length"], 10, ai) for ai in args.ai]
+    seen = []
+    for case in cases:
+        size, length = case[0], case[1]
+        if length <= size * size // 2 and case not in seen:
+            seen.append(case)
+    return seen
+
+def compare(results, baseline_file, tolerance):
+    with open(baseline_file) as f:
+        baseline = {case_key(r): r for r in json.load(f)["results"]}
+    regressions = []
+    for result in results:
+        old = baseline.get(case_key(result))
+        if old is None:
+            continue
+        if result["ticks_per_second"] < old["ticks_per_second"] * (1 - tolerance):
+            regressions.append((result, "ticks/s", old["ticks_per_second"], result["ticks_per_second"]))
+        if result["p50_ms"] > old["p50_ms"] * (1 + tolerance):
+            regressions.append((result, "p50 ms", old["p50_ms"], result["p50_ms"]))
+    return regressions
+
+def print_table(results):
+    columns = ["size", "length", "enemies", "ai", "ticks_per_second", "p50_ms", "p99_ms",
+               "move_snake_us", "move_enemies_us", "spawn_food_us", "peak_mb"]
+    headers = ["size", "length", "enemies", "ai", "ticks/s", "p50 ms", "p99 ms",
+               "snake us", "enemies us", "food us", "peak MB"]
+    rows = [[str(r.get(c, "")) for c in columns] for r in results]
+    widths = [max(len(h), *(len(row[i]) for row in rows)) for i, h in enumerate(headers)]
+    print("  ".join(h.rjust(w) for h, w in zip(headers, widths)))
+    for row in rows:
+        print("  ".join(v.rjust(w) for v, w in zip(row, widths)))
+
+def int_list(text):
+    return [int(v) for v in text.split(",")]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Snake engine benchmarks")
+    parser.add_argument("--sizes", type=int_list, default=[40, 200, 1000, 2000], help="board sizes (square)")
+    parser.add_argument("--lengths", type=int_list, default=[1, 1000, 10000, 100000], help="starting player lengths")
+    parser.add_argument("--enemies", type=int_list, default=[1, 10, 50], help="enemy counts")
+    parser.add_argument("--ai", type=lambda t: t.split(","), default=sorted(snake_engine.ENEMY_AIS), help="enemy AIs")
+    parser.add_argument("--full", action="store_true", help="run every combination instead of one sweep per dimension")
+    parser.add_argument("--ticks", type=int, default=2000, help="ticks timed per case")
+    parser.add_argument("--memory-ticks", type=int, default=200, help="ticks in the peak memory run (0 to skip)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case, the fastest is kept")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--replays", metavar="FILE", help="also time headless playback of the games in FILE")
+    parser.add_argument("--json", metavar="FILE", help="write results as JSON")
+    parser.add_argument("--csv", metavar="FILE", help="write results as CSV")
+    parser.add_argument("--baseline", metavar="FILE", help="JSON results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown against the baseline (0.25 = 25%%)")
+    args = parser.parse_args()
+
+    unknown = set(args.ai) - set(snake_engine.ENEMY_AIS)
+    if unknown:
+        parser.error("unknown enemy AI: " + ", ".join(sorted(unknown)))
+
+    results = []
+    runners = {}     # case key -> function that times the case once
+    for size, length, enemies, ai in plan_cases(args):
+        print(f"running {size}x{size} length={length} enemies={enemies} ai={ai} ...", file=sys.stderr)
+        run = lambda size=size, length=length, enemies=enemies, ai=ai: \
+            run_case(size, length, enemies, ai, args.ticks, args.seed)
+        result = best_of(args.repeat, run)
+        runners[case_key(result)] = run
+        if args.memory_ticks:
+            result["peak_mb"] = peak_memory_mb(size, length, enemies, ai, args.memory_ticks, args.seed)
+        results.append(result)
+
+    if args.replays:
+        print(f"playing back {args.replays} ...", file=sys.stderr)
+        result = best_of(args.repeat, lambda: run_replays(args.replays))
+        runners[case_key(result)] = lambda: run_replays(args.replays)
+        results.append(result)
+
+    regressions = []
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        # Noise only ever makes a run slower, so a case that looks regressed
+        # is run again and keeps its best result before it's reported
+        for _ in range(CONFIRM_ROUNDS):
+            if not regressions:
+                break
+            for key in {case_key(r) for r, what, old, new in regressions}:
+                i = next(i for i, r in enumerate(results) if case_key(r) == key)
+                print(f"re-running {case_name(results[i])} ...", file=sys.stderr)
+                results[i] = best_of(args.repeat, runners[key], results[i])
+            regressions = compare(results, args.baseline, args.tolerance)
+
+    print_table(results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"python": sys.version.split()[0], "ticks": args.ticks, "results": results}, f, indent=1)
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0]))
+            writer.writeheader()
+            writer.writerows(results)
+
+    if args.baseline:
+        for result, what, old, new in regressions:
+            print(f"REGRESSION {case_name(result)}: {what} {old} -> {new}")
+        if regressions:
+            sys.exit(1)
+        print("no regressions against", args.baseline)
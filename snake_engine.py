@@ -0,0 +1,654 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# The Snake rules, headless. Snake.py draws them in a Tk window; snake_env.py,
+# snake_bench.py and anything else that only simulates imports this module so
+# it never pulls in tkinter.
+
+import random
+import time
+import heapq
+import json
+import zlib
+from array import array
+from collections import deque
+
+# === Game Constants ===
+CELL_SIZE = 20                 # Size of each square cell in pixels
+GRID_WIDTH = 40                # Number of cells horizontally
+GRID_HEIGHT = 40               # Number of cells vertically
+BORDER_OFFSET = 4 * 4 // CELL_SIZE  # Accounts for 4 border layers of 4px each
+
+# Direction mapping
+DIRECTIONS = {
+    "Up": (0, -1),
+    "Down": (0, 1),
+    "Left": (-1, 0),
+    "Right": (1, 0),
+}
+OPPOSITE = {"Up": "Down", "Down": "Up", "Left": "Right", "Right": "Left"}
+
+
+# === Simulation Engine ===
+# All of the game rules live here, with no Tk anywhere, so the same game can be
+# stepped as fast as the CPU allows (AI evaluation, regression runs on headless
+# machines) or driven one tick at a time by the window in Snake.py.
+#
+# Cells on the board are tracked in an occupancy grid: one byte per cell saying
+# who is standing on it, so collision checks are a single index instead of
+# scanning both snake bodies. Bodies are deques (head first), so a move is one
+# pop and one appendleft.
+EMPTY, PLAYER, ENEMY = 0, 1, 2
+RANDOMNESS_PROBABILITY = 0.25  # Chance the enemy makes a random move
+
+CHECK_EVERY = 100              # Ticks between state checksums in a replay
+INPUT_QUEUE = 3                # Key presses buffered ahead of the snake
+
+# One AI-controlled snake. Every enemy shares the ENEMY code on the board.
+class Enemy:
+    def __init__(self, body, ai):
+        self.body = deque(body)    # head first
+        self.ai = ai
+        self.moved = 0             # Moves made so far, so a renderer knows how many cells are new
+
+class SnakeGame:
+    def __init__(self, width=GRID_WIDTH, height=GRID_HEIGHT, border=BORDER_OFFSET,
+                 start_length=1, seed=None, enemy_ai="greedy", enemies=1, food_count=1):
+        self.width = width
+        self.height = height
+        self.border = border
+        self.start_length = start_length
+        self.food_count = food_count       # Food items on the board at once
+        # Each game gets its own seed drawn from seed_rng, and self.rng is
+        # reseeded with it on reset, so any single game can be replayed
+        # from its seed alone
+        self.seed_rng = random.Random(seed)
+        self.rng = random.Random()
+        self.board = bytearray(width * height)
+        self.moves = self.move_table()
+        self.start_pos = (width // 2, height // 2)
+        self.top_score = 0                 # Highest score this session
+        self.ticks = 0                     # Ticks played over all games
+        # enemy_ai is one strategy name for every enemy, or a list that is
+        # handed out in turn
+        self.ai_names = [enemy_ai] if isinstance(enemy_ai, str) else list(enemy_ai)
+        self.enemy_ais = [ENEMY_AIS[self.ai_names[i % len(self.ai_names)]]() for i in range(enemies)]
+        self.food_field = None             # DistanceField to the food, if an AI needs one
+        self.playback = None               # Replay being played back, if any
+        self.reset()
+
+    # Everything needed to build an identical SnakeGame
+    def config(self):
+        return {"width": self.width, "height": self.height, "border": self.border,
+                "start_length": self.start_length, "enemy_ai": self.ai_names,
+                "enemies": len(self.enemy_ais), "food_count": self.food_count}
+
+    # Put both snakes back at their starting positions on an empty board
+    def reset(self, game_seed=None):
+        if game_seed is None:
+            game_seed = self.seed_rng.randrange(2 ** 63)
+        self.rng.seed(game_seed)
+        self.replay = Replay(self.config(), game_seed)
+        self.game_ticks = 0                # Ticks played this game
+        self.last_direction = "Right"
+        self.board[:] = bytes(len(self.board))
+        self.build_free_index()
+        self.snake = deque(self.starting_body(self.start_pos, self.start_length))
+        self.player_moved = 0      # Like Enemy.moved
+        for pos in self.snake:
+            self.occupy(pos, PLAYER)
+        self.enemies = []
+        for body, ai in zip(self.enemy_starts(), self.enemy_ais):
+            self.enemies.append(Enemy(body, ai))
+            for pos in body:
+                self.occupy(pos, ENEMY)
+        # The per-tick search budget is split between the enemies
+        self.search_budget = max(16, AI_BUDGET // max(1, len(self.enemies)))
+        self.direction = "Right"
+        self.input_queue = deque()
+        self.score = 0
+        self.alive = True
+        self.foods = set()
+        for _ in range(self.food_count):
+            self.spawn_food()
+        # A fresh field every game, so a replayed game's AIs see exactly
+        # what they saw when it was recorded
+        self.food_field = None
+        if any(isinstance(ai, PathfindingAI) for ai in self.enemy_ais):
+            self.distance_field()
+
+    # --- Occupancy grid ---
+    def cell_index(self, pos):
+        return pos[1] * self.width + pos[0]
+
+    def in_bounds(self, pos):
+        return (self.border <= pos[0] < self.width - self.border and
+                self.border <= pos[1] < self.height - self.border)
+
+    def is_free(self, pos):
+        return self.in_bounds(pos) and self.board[self.cell_index(pos)] == EMPTY
+
+    def occupy(self, pos, owner):
+        idx = self.cell_index(pos)
+        self.board[idx] = owner
+        if self.free_pos[idx] >= 0:
+            self.take_free(idx)
+
+    def release(self, pos):
+        idx = self.cell_index(pos)
+        self.board[idx] = EMPTY
+        if self.free_pos[idx] == NOT_FREE:
+            self.give_free(idx)
+        if self.food_field:
+            self.food_field.cell_freed(idx)
+
+    # --- Free-cell index ---
+    # Every cell food may appear on that is neither under a snake nor already
+    # food is kept in free_list. free_pos maps a cell back to its slot in the
+    # list (NOT_FREE while taken, OUTSIDE for cells food never goes on).
+    # Taking a cell swaps the last entry into its slot, so adding, removing
+    # and picking a random free cell are all O(1) however full the board is.
+    def build_free_index(self):
+        self.free_list = array("i")
+        self.free_pos = array("i", [OUTSIDE]) * len(self.board)
+        lo_x, hi_x = self.border + 1, self.width - self.border - 1
+        for y in range(self.border + 1, self.height - self.border - 1):
+            row = y * self.width
+            start = len(self.free_list)
+            self.free_list.extend(range(row + lo_x, row + hi_x))
+            self.free_pos[row + lo_x:row + hi_x] = array("i", range(start, len(self.free_list)))
+
+    def take_free(self, idx):
+        slot = self.free_pos[idx]
+        last = self.free_list.pop()
+        if last != idx:
+            self.free_list[slot] = last
+            self.free_pos[last] = slot
+        self.free_pos[idx] = NOT_FREE
+
+    def give_free(self, idx):
+        self.free_pos[idx] = len(self.free_list)
+        self.free_list.append(idx)
+
+    # Closest food to pos by Manhattan distance, None if there's no food
+    def nearest_food(self, pos):
+        return min(self.foods, key=lambda food: manhattan(pos, food), default=None)
+
+    # One byte per cell with a bit set for each direction that stays on the
+    # board, so the AIs can walk the grid by index without bounds checks.
+    # The offset to add to a cell index for each bit is in self.steps.
+    def move_table(self):
+        self.steps = [(1 << i, dy * self.width + dx) for i, (dx, dy) in enumerate(DIRECTIONS.values())]
+        up, down, left, right = (bit for bit, _ in self.steps)
+        lo_x, hi_x = self.border, self.width - self.border - 1
+        lo_y, hi_y = self.border, self.height - self.border - 1
+
+        def row(y):
+            if not lo_y <= y <= hi_y:
+                return bytes(self.width)
+            return bytes((up if y > lo_y else 0) | (down if y < hi_y else 0) |
+                         (left if x > lo_x else 0) | (right if x < hi_x else 0)
+                         if lo_x <= x <= hi_x else 0
+                         for x in range(self.width))
+        # Only the first, last and off-board rows differ, so build each once
+        rows = {}
+        table = bytearray()
+        for y in range(self.height):
+            key = (lo_y <= y <= hi_y, y > lo_y, y < hi_y)
+            if key not in rows:
+                rows[key] = row(y)
+            table += rows[key]
+        return table
+
+    # Distances to the food over the current board, shared by every AI
+    def distance_field(self):
+        if self.food_field is None:
+            self.food_field = DistanceField(self)
+            self.food_changed()
+        return self.food_field
+
+    def food_changed(self):
+        if self.food_field:
+            self.food_field.retarget([self.cell_index(pos) for pos in self.foods])
+
+    # Lay a snake of the given length out behind its head. The body runs left
+    # along the head's row and then snakes back and forth down the board, so
+    # very long starting snakes still fit.
+    def starting_body(self, head, length):
+        body = [head]
+        x, y = head
+        step = -1
+        while len(body) < length:
+            if self.in_bounds((x + step, y)):
+                x += step
+            else:
+                y += 1
+                step = -step
+                if not self.in_bounds((x, y)):
+                    break
+            body.append((x, y))
+        return body
+
+    # Two-cell vertical starting spots for the enemies: the first one is where
+    # the single enemy always started, the rest fill in a lattice across the
+    # board, skipping anything the player's body covers. Stops early if the
+    # board runs out of room.
+    def enemy_starts(self):
+        taken = set(self.snake)
+        for y in range(self.border + 5, self.height - self.border - 1, 4):
+            for x in range(self.border + 5, self.width - self.border, 4):
+                body = [(x, y), (x, y + 1)]
+                if all(self.in_bounds(pos) and pos not in taken for pos in body):
+                    yield body
+
+    # --- Player input ---
+    def change_direction(self, new_direction):
+        if new_direction in DIRECTIONS and self.direction != OPPOSITE[new_direction]:
+            self.direction = new_direction
+
+    # Key presses from the window are queued and used one per tick, so two
+    # quick turns both happen (instead of only the last one) and can't add up
+    # to reversing into the snake's own neck
+    def queue_direction(self, new_direction):
+        if new_direction in DIRECTIONS and len(self.input_queue) < INPUT_QUEUE:
+            self.input_queue.append(new_direction)
+
+    def take_queued_input(self):
+        while self.input_queue:
+            new_direction = self.input_queue.popleft()
+            if new_direction not in (self.direction, OPPOSITE[self.direction]):
+                self.direction = new_direction
+                return
+
+    # --- Replays ---
+    # Play a recorded game: the board is reset with the game's seed and the
+    # recorded direction changes replace the keyboard. step() raises
+    # ReplayMismatch if the state ever differs from the recording.
+    def start_playback(self, replay):
+        if replay.config != self.config():
+            raise ValueError("replay was recorded with different game settings")
+        self.reset(replay.seed)
+        self.playback = replay
+        self.playback_inputs = dict(replay.inputs)
+        self.playback_checks = dict(replay.checksums)
+
+    def stop_playback(self):
+        self.playback = None
+
+    # CRC of everything the rules depend on
+    def checksum(self):
+        crc = zlib.crc32(self.board)
+        return zlib.crc32(repr((sorted(self.foods), self.score, self.direction)).encode(), crc)
+
+    # --- One game tick: player moves, then the enemies ---
+    # Returns False once the game is over.
+    def step(self):
+        if not self.alive:
+            return False
+        if self.playback:
+            self.direction = self.playback_inputs.get(self.game_ticks, self.direction)
+        else:
+            self.take_queued_input()
+        if self.direction != self.last_direction:
+            self.replay.inputs.append((self.game_ticks, self.direction))
+            self.last_direction = self.direction
+        self.ticks += 1
+        self.game_ticks += 1
+
+        if self.move_snake():
+            if self.food_field:
+                self.food_field.update(AI_BUDGET)
+            self.move_enemies()
+
+        if self.game_ticks % CHECK_EVERY == 0 or not self.alive:
+            self.check_replay()
+        return self.alive
+
+    # Record a checksum, or when playing back compare against the recording
+    def check_replay(self):
+        crc = self.checksum()
+        self.replay.checksums.append((self.game_ticks, crc))
+        self.replay.ticks = self.game_ticks
+        self.replay.score = self.score
+        if self.playback:
+            expected = self.playback_checks.get(self.game_ticks)
+            if expected is not None and expected != crc:
+                raise ReplayMismatch(f"replay diverged at tick {self.game_ticks}")
+            if not self.alive and (self.game_ticks, self.score) != (self.playback.ticks, self.playback.score):
+                raise ReplayMismatch(f"replay ended at tick {self.game_ticks} with score {self.score}, "
+                                     f"recording ended at tick {self.playback.ticks} with score {self.playback.score}")
+
+    def move_snake(self):
+        dx, dy = DIRECTIONS[self.direction]
+        head_x, head_y = self.snake[0]
+        new_head = (head_x + dx, head_y + dy)
+
+        # Game over checks (walls, either snake's body)
+        if not self.is_free(new_head):
+            self.alive = False
+            self.top_score = max(self.top_score, self.score)
+            return False
+
+        self.player_moved += 1
+        if self.advance(self.snake, new_head, PLAYER):
+            self.score += 1
+        return True
+
+    # All enemies pick their move against the same board, then the moves are
+    # applied in one pass. If several heads go for the same cell, the longest
+    # snake gets it (first in the list on a tie) and the others wait a tick.
+    # Every cell was free when it was picked, so that is the only conflict.
+    def move_enemies(self):
+        plans = {}
+        for enemy in self.enemies:
+            new_head = enemy.ai.choose(self, enemy.body)
+            if new_head is not None:
+                plans.setdefault(new_head, []).append(enemy)
+
+        for new_head, contenders in plans.items():
+            winner = max(contenders, key=lambda enemy: len(enemy.body))
+            winner.moved += 1
+            self.advance(winner.body, new_head, ENEMY)
+
+    # Move a body's head onto new_head. A snake that lands on food grows and
+    # new food appears somewhere else; otherwise the tail cell is given back.
+    # Returns whether it ate.
+    def advance(self, body, new_head, owner):
+        body.appendleft(new_head)
+        self.occupy(new_head, owner)
+        if new_head in self.foods:
+            self.foods.remove(new_head)
+            self.spawn_food()
+            self.food_changed()
+            return True
+        self.release(body.pop())
+        return False
+
+    # Put one food item on a random free cell. On a full board there's
+    # nowhere to put it, and the game carries on with less food.
+    def spawn_food(self):
+        if not self.free_list:
+            return
+        idx = self.free_list[self.rng.randrange(len(self.free_list))]
+        self.take_free(idx)
+        self.foods.add((idx % self.width, idx // self.width))
+
+# === Replays ===
+# A recorded game: the game's config and seed, every direction change with the
+# tick it took effect on, and a state checksum every CHECK_EVERY ticks plus at
+# the end. The enemies and food only draw from the seeded game RNG, so the
+# seed plus the player's inputs replay the game bit for bit; the checksums
+# catch it if a code change breaks that.
+class ReplayMismatch(Exception):
+    pass
+
+class Replay:
+    def __init__(self, config, seed):
+        self.config = config
+        self.seed = seed
+        self.inputs = []       # (tick, direction)
+        self.checksums = []    # (tick, crc)
+        self.ticks = 0
+        self.score = 0
+
+    def to_dict(self):
+        return {"config": self.config, "seed": self.seed, "ticks": self.ticks, "score": self.score,
+                "inputs": [[tick, ACTIONS.index(d)] for tick, d in self.inputs],
+                "checksums": self.checksums}
+
+    @classmethod
+    def from_dict(cls, data):
+        replay = cls(data["config"], data["seed"])
+        replay.inputs = [(tick, ACTIONS[d]) for tick, d in data["inputs"]]
+        replay.checksums = [tuple(c) for c in data["checksums"]]
+        replay.ticks = data["ticks"]
+        replay.score = data["score"]
+        return replay
+
+ACTIONS = list(DIRECTIONS)   # Directions are stored as their index in here
+
+# A replay file holds any number of games, so a file of recorded games
+# doubles as a benchmark corpus
+def save_replays(filename, replays):
+    with open(filename, "w") as f:
+        json.dump({"version": 1, "games": [r.to_dict() for r in replays]}, f, separators=(",", ":"))
+
+def load_replays(filename):
+    with open(filename) as f:
+        data = json.load(f)
+    return [Replay.from_dict(game) for game in data["games"]]
+
+def game_for_replay(replay):
+    return SnakeGame(**replay.config)
+
+# Play replays back with no window as fast as possible, checking every one
+# against its recording. Returns a summary of the run.
+def play_headless(replays):
+    ticks = 0
+    start = time.perf_counter()
+    for replay in replays:
+        game = game_for_replay(replay)
+        game.start_playback(replay)
+        while game.step():
+            pass
+        ticks += game.game_ticks
+    elapsed = time.perf_counter() - start
+    return {
+        "games": len(replays),
+        "ticks": ticks,
+        "seconds": elapsed,
+        "ticks_per_second": ticks / elapsed if elapsed else float("inf"),
+    }
+
+# === Helper: Manhattan Distance ===
+def manhattan(a, b):
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+# === Enemy AI ===
+# Each strategy has choose(game, body) which returns the cell the snake's head
+# should move to next, or None if it's boxed in. The pathfinding ones work on
+# the occupancy grid and never look at more than AI_BUDGET cells per tick
+# (split between the enemies), so the cost per tick stays the same on big
+# boards and with lots of snakes.
+AI_BUDGET = 2000
+UNKNOWN = 2 ** 31 - 1
+NOT_FREE, OUTSIDE = -1, -2     # free_pos markers, see SnakeGame.build_free_index
+
+def neighbours(game, idx):
+    moves = game.moves[idx]
+    return [idx + offset for bit, offset in game.steps if moves & bit]
+
+# Breadth-first distance from the nearest food to every free cell.
+# Rebuilt whenever food is eaten, but only AI_BUDGET cells are expanded per
+# tick, so a new field on a huge board fills in over a few ticks. In between,
+# cells that haven't been reached fall back to Manhattan distance.
+# Bodies moving never trigger a rebuild. A cell that gets blocked keeps its old
+# distance, which is now too small, but that is still a lower bound, so A* can
+# keep using it as a heuristic. A freed cell takes its distance from its
+# neighbours, and the drop spreads from there through the same queue.
+# The dist array is allocated once; a rebuild only clears the cells the last
+# search reached (listed in reached), not the whole board.
+class DistanceField:
+    def __init__(self, game):
+        self.game = game
+        self.dist = array("i", [UNKNOWN]) * len(game.board)
+        self.reached = []        # cells with a known distance, cleared on retarget
+        self.queue = deque()     # cells whose neighbours still need relaxing
+        self.targets = set()
+
+    def retarget(self, cells):
+        dist, reached = self.dist, self.reached
+        for idx in reached:
+            dist[idx] = UNKNOWN
+        reached.clear()
+        self.targets = set(cells)
+        for idx in self.targets:
+            dist[idx] = 0
+        reached.extend(self.targets)
+        self.queue = deque(self.targets)
+
+    def cell_freed(self, idx):
+        board, dist = self.game.board, self.dist
+        best = min((dist[n] for n in neighbours(self.game, idx) if board[n] == EMPTY), default=UNKNOWN)
+        if best != UNKNOWN and best + 1 < dist[idx]:
+            if dist[idx] == UNKNOWN:
+                self.reached.append(idx)
+            dist[idx] = best + 1
+            self.queue.append(idx)
+
+    def update(self, budget):
+        board, dist, queue, reached = self.game.board, self.dist, self.queue, self.reached
+        moves, steps = self.game.moves, self.game.steps
+        while queue and budget > 0:
+            budget -= 1
+            idx = queue.popleft()
+            d = dist[idx] + 1
+            m = moves[idx]
+            for bit, offset in steps:
+                if m & bit:
+                    n = idx + offset
+                    if board[n] == EMPTY and d < dist[n]:
+                        if dist[n] == UNKNOWN:
+                            reached.append(n)
+                        dist[n] = d
+                        queue.append(n)
+
+    # Lower bound on the number of moves from idx to the nearest food
+    def estimate(self, idx):
+        d = self.dist[idx]
+        if d != UNKNOWN:
+            return d
+        w = self.game.width
+        return min((abs(idx % w - t % w) + abs(idx // w - t // w) for t in self.targets), default=0)
+
+# Count the free cells reachable from idx, stopping at limit
+def reachable_area(game, idx, limit):
+    seen = {idx}
+    queue = deque([idx])
+    while queue and len(seen) < limit:
+        for n in neighbours(game, queue.popleft()):
+            if n not in seen and game.board[n] == EMPTY:
+                seen.add(n)
+                queue.append(n)
+    return len(seen)
+
+# The original enemy: head for whichever of the nearest food or the player's
+# head is closer, one greedy step at a time, with a 25% chance of a random move
+class GreedyAI:
+    def choose(self, game, body):
+        head = body[0]
+        player_head = game.snake[0]
+        food = game.nearest_food(head)
+
+        # Choose the closer target
+        target = food if food and manhattan(head, food) <= manhattan(head, player_head) else player_head
+
+        # Valid directions
+        options = [(head[0] + dx, head[1] + dy) for dx, dy in DIRECTIONS.values()]
+        valid = [pos for pos in options if game.is_free(pos)]
+
+        if not valid:
+            return None
+
+        # 25% chance to act randomly
+        if game.rng.random() < RANDOMNESS_PROBABILITY:
+            return game.rng.choice(valid)
+        valid.sort(key=lambda pos: manhattan(pos, target))
+        return valid[0]
+
+# Base for the planners: pick a move towards the food with plan(), then make
+# sure it doesn't lead into a pocket too small for the body. If it does, take
+# whichever move has the most room instead.
+class PathfindingAI:
+    def choose(self, game, body):
+        field = game.distance_field()
+        head = game.cell_index(body[0])
+        valid = [n for n in neighbours(game, head) if game.board[n] == EMPTY]
+        if not valid:
+            return None
+
+        step = self.plan(game, field, head, valid)
+        need = min(len(body) + 1, game.search_budget)
+        if step is None or reachable_area(game, step, need) < need:
+            step = max(valid, key=lambda n: reachable_area(game, n, need))
+        return (step % game.width, step // game.width)
+
+# Walk straight down the distance field
+class BfsAI(PathfindingAI):
+    def plan(self, game, field, head, valid):
+        return min(valid, key=field.estimate)
+
+# A* from the head to the nearest food, with the distance field as the heuristic.
+# When the field is exact this only expands cells along the path. If the
+# budget runs out first, it takes the first step towards the most promising
+# cell found so far.
+class AStarAI(PathfindingAI):
+    def plan(self, game, field, head, valid):
+        goals = field.targets
+        board = game.board
+        best_g = {head: 0}
+        # Heap entries are (f, -g, cell, first step); ties on f go to the deeper
+        # node, which keeps the search on the path when the field is exact
+        open_heap = [(1 + field.estimate(n), -1, n, n) for n in valid]
+        heapq.heapify(open_heap)
+        best = None
+        expanded = 0
+        while open_heap and expanded < game.search_budget:
+            f, g, idx, first = heapq.heappop(open_heap)
+            g = -g
+            if idx in goals:
+                return first
+            if best_g.get(idx, UNKNOWN) <= g:
+                continue
+            best_g[idx] = g
+            expanded += 1
+            if best is None or f - g < best[0]:
+                best = (f - g, first)
+            for n in neighbours(game, idx):
+                if board[n] == EMPTY and g + 1 < best_g.get(n, UNKNOWN):
+                    heapq.heappush(open_heap, (g + 1 + field.estimate(n), -g - 1, n, first))
+        return best[1] if best else None
+
+ENEMY_AIS = {"greedy": GreedyAI, "bfs": BfsAI, "astar": AStarAI}
+
+# === Headless Runs ===
+# Stand-in for the keyboard when there's no window: head for the food, and
+# avoid walls and bodies when possible.
+def greedy_player(game):
+    head = game.snake[0]
+    food = game.nearest_food(head) or head
+    best = None
+    for name, (dx, dy) in DIRECTIONS.items():
+        if name == OPPOSITE[game.direction]:
+            continue
+        pos = (head[0] + dx, head[1] + dy)
+        if game.is_free(pos):
+            dist = manhattan(pos, food)
+            if best is None or dist < best[0]:
+                best = (dist, name)
+    return best[1] if best else game.direction
+
+# Run the game for a fixed number of ticks with no rendering at all, starting
+# a new game whenever the player dies. Returns a summary of the run.
+# Finished games' replays are appended to replays if a list is passed in.
+def run_headless(game, ticks, player=greedy_player, replays=None):
+    games = 1
+    scores = []
+    start = time.perf_counter()
+    for _ in range(ticks):
+        game.change_direction(player(game))
+        if not game.step():
+            scores.append(game.score)
+            if replays is not None:
+                replays.append(game.replay)
+            games += 1
+            game.reset()
+    elapsed = time.perf_counter() - start
+    return {
+        "ticks": ticks,
+        "seconds": elapsed,
+        "ticks_per_second": ticks / elapsed if elapsed else float("inf"),
+        "games": games,
+        "top_score": game.top_score,
+        "mean_score": sum(scores) / len(scores) if scores else game.score,
+    }
@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# Batched Snake environment for AI training.
+#
+# Runs the same rules as SnakeGame in snake_engine.py (move_snake, move_enemies with
+# one greedy enemy, spawn_food) for N independent games at once, with every
+# piece of game state held in NumPy arrays so one step() advances all of them
+# together:
+#
+#   board      (N, W*H)  occupancy grid, EMPTY / PLAYER / ENEMY per cell
+#   bodies     (N, cap)  ring buffers of cell indices, one per snake
+#   head/len   (N,)      ring buffer head slot and body length per snake
+#   food       (N,)      cell index of the food, -1 when there's no free cell for it
+#   direction  (N,)      player direction, index into ACTIONS
+#   score      (N,)      food eaten this game
+#
+# Cells are numbered y * width + x, same as SnakeGame.cell_index.
+#
+# The API is gym-style:
+#   env = SnakeEnv(10000, seed=0)
+#   obs = env.reset()                        # (N, H, W) uint8
+#   obs, reward, done, info = env.step(actions)
+# Finished games are reset automatically inside step(); their final scores are
+# in info["final_score"].
+
+import argparse
+import time
+import numpy as np
+
+from snake_engine import (DIRECTIONS, OPPOSITE, EMPTY, PLAYER, ENEMY, RANDOMNESS_PROBABILITY,
+                   GRID_WIDTH, GRID_HEIGHT, BORDER_OFFSET, SnakeGame)
+
+# Actions are indexes into DIRECTIONS: 0 Up, 1 Down, 2 Left, 3 Right
+ACTIONS = list(DIRECTIONS)
+DX = np.array([DIRECTIONS[a][0] for a in ACTIONS])
+DY = np.array([DIRECTIONS[a][1] for a in ACTIONS])
+OPPOSITE_ACTION = np.array([ACTIONS.index(OPPOSITE[a]) for a in ACTIONS])
+
+# Extra codes that only appear in observations
+FOOD, PLAYER_HEAD, ENEMY_HEAD = 3, 4, 5
+
+FOOD_TRIES = 8   # Random picks per game before spawn_food scans for the free cells
+
+class SnakeEnv:
+    def __init__(self, num_games, width=GRID_WIDTH, height=GRID_HEIGHT, border=BORDER_OFFSET,
+                 start_length=1, seed=None):
+        self.n = num_games
+        self.width = width
+        self.height = height
+        self.border = border
+        self.rng = np.random.default_rng(seed)
+
+        # Starting bodies come from the single-game engine so both agree
+        template = SnakeGame(width, height, border, start_length)
+        self.start_player = np.array([self.cell(p) for p in template.snake])
+        self.start_enemy = np.array([self.cell(p) for p in template.enemies[0].body])
+
+        # Cells food can appear on, same area as SnakeGame's free-cell index
+        lo = border + 1
+        ys, xs = np.mgrid[lo:height - border - 1, lo:width - border - 1]
+        self.food_area = (ys * width + xs).ravel()
+
+        # A snake can never be longer than the playable area
+        self.cap = (width - 2 * border) * (height - 2 * border)
+        cell_type = np.uint16 if width * height <= 65536 else np.int32
+
+        self.board = np.zeros((num_games, width * height), np.uint8)
+        self.player_body = np.zeros((num_games, self.cap), cell_type)
+        self.enemy_body = np.zeros((num_games, self.cap), cell_type)
+        self.player_head = np.zeros(num_games, np.int64)
+        self.enemy_head = np.zeros(num_games, np.int64)
+        self.player_len = np.zeros(num_games, np.int64)
+        self.enemy_len = np.zeros(num_games, np.int64)
+        self.food = np.zeros(num_games, np.int64)
+        self.direction = np.zeros(num_games, np.int64)
+        self.score = np.zeros(num_games, np.int64)
+
+    def cell(self, pos):
+        return pos[1] * self.width + pos[0]
+
+    # --- Reset ---
+    def reset(self):
+        self.reset_games(np.arange(self.n))
+        return self.observe()
+
+    # Put the given games back to their starting position
+    def reset_games(self, games):
+        if len(games) == 0:
+            return
+        self.board[games] = EMPTY
+        for body, head, length, start, owner in (
+                (self.player_body, self.player_head, self.player_len, self.start_player, PLAYER),
+                (self.enemy_body, self.enemy_head, self.enemy_len, self.start_enemy, ENEMY)):
+            # Ring buffer holds the body tail first, so the head is the last slot written
+            body[games, :len(start)] = start[::-1]
+            head[games] = len(start) - 1
+            length[games] = len(start)
+            self.board[games[:, None], start[None, :]] = owner
+        self.direction[games] = ACTIONS.index("Right")
+        self.score[games] = 0
+        self.spawn_food(games)
+
+    # --- One tick for every game ---
+    def step(self, actions):
+        games = np.arange(self.n)
+        actions = np.asarray(actions)
+
+        # Player input, ignoring reversals like SnakeGame.change_direction
+        turn = actions != OPPOSITE_ACTION[self.direction]
+        self.direction = np.where(turn, actions, self.direction)
+
+        # Player move
+        head = self.player_body[games, self.player_head].astype(np.int64)
+        x = head % self.width + DX[self.direction]
+        y = head // self.width + DY[self.direction]
+        new_head = self.free_cells(games, x, y)
+        done = new_head < 0
+        live = games[~done]
+        ate = self.advance(live, new_head[live], self.player_body, self.player_head, self.player_len, PLAYER)
+        self.score[ate] += 1
+        self.spawn_food(ate)
+
+        # The enemy only moves in games that are still going
+        enemy_ate = self.move_enemy(live)
+        self.spawn_food(enemy_ate)
+        self.spawn_food(live[self.food[live] < 0])   # No free cell last time, try again
+
+        reward = np.zeros(self.n, np.float32)
+        reward[ate] += 1.0
+        reward[done] = -1.0
+        info = {"final_score": self.score[done].copy(), "finished": games[done]}
+        self.reset_games(games[done])
+        return self.observe(), reward, done, info
+
+    # Cell index of (x, y) where it's on the board and empty in that game, -1
+    # everywhere else. x and y have one row per game (and optionally a column
+    # per candidate move).
+    def free_cells(self, games, x, y):
+        b = self.border
+        inside = (x >= b) & (x < self.width - b) & (y >= b) & (y < self.height - b)
+        cells = np.where(inside, y * self.width + x, 0)
+        rows = games.reshape((-1,) + (1,) * (cells.ndim - 1))
+        free = inside & (self.board[rows, cells] == EMPTY)
+        return np.where(free, cells, -1)
+
+    # Move one snake's head to new_head in the given games. Snakes that land on
+    # the food grow; the rest give up their tail cell. Returns the games that ate.
+    def advance(self, games, new_head, body, head, length, owner):
+        ate = new_head == self.food[games]
+        movers = games[~ate]
+        tail_slot = (head[movers] - length[movers] + 1) % self.cap
+        self.board[movers, body[movers, tail_slot]] = EMPTY
+        length[movers] -= 1
+
+        head[games] = (head[games] + 1) % self.cap
+        body[games, head[games]] = new_head
+        length[games] += 1
+        self.board[games, new_head] = owner
+        return games[ate]
+
+    def move_enemy(self, games):
+        head = self.enemy_body[games, self.enemy_head[games]].astype(np.int64)
+        player = self.player_body[games, self.player_head[games]].astype(np.int64)
+        food = self.food[games]
+        hx, hy = head % self.width, head // self.width
+
+        # Choose the closer target
+        to_food = np.abs(hx - food % self.width) + np.abs(hy - food // self.width)
+        to_player = np.abs(hx - player % self.width) + np.abs(hy - player // self.width)
+        target = np.where((to_food <= to_player) & (food >= 0), food, player)
+        tx, ty = target % self.width, target // self.width
+
+        # Valid directions
+        ox = hx[:, None] + DX[None, :]
+        oy = hy[:, None] + DY[None, :]
+        options = self.free_cells(games, ox, oy)
+        valid = options >= 0
+        can_move = valid.any(axis=1)
+
+        # Closest valid option to the target (ties go to the first direction,
+        # like the stable sort in SnakeGame), or a random valid option 25% of the time
+        dist = np.abs(ox - tx[:, None]) + np.abs(oy - ty[:, None])
+        dist[~valid] = np.iinfo(dist.dtype).max
+        greedy = dist.argmin(axis=1)
+        keys = self.rng.random(valid.shape)
+        keys[~valid] = -1.0
+        random_pick = keys.argmax(axis=1)
+        randomly = self.rng.random(len(games)) < RANDOMNESS_PROBABILITY
+        choice = np.where(randomly, random_pick, greedy)
+
+        movers = games[can_move]
+        new_head = options[can_move, choice[can_move]]
+        return self.advance(movers, new_head, self.enemy_body, self.enemy_head, self.enemy_len, ENEMY)
+
+    # Random empty cell inside the food area for each of the given games,
+    # redrawing only for the games whose pick landed on a snake. That's quick
+    # while the board is mostly empty; games still without food after
+    # FOOD_TRIES picks (a nearly full board) pick from a scan of their free
+    # cells instead, and get no food (-1) if there are none.
+    def spawn_food(self, games):
+        for _ in range(FOOD_TRIES):
+            if not len(games):
+                return
+            cells = self.food_area[self.rng.integers(0, len(self.food_area), len(games))]
+            free = self.board[games, cells] == EMPTY
+            self.food[games[free]] = cells[free]
+            games = games[~free]
+        for game in games.tolist():
+            free = self.food_area[self.board[game, self.food_area] == EMPTY]
+            self.food[game] = self.rng.choice(free) if len(free) else -1
+
+    # --- Observations ---
+    # (N, H, W) uint8 grid per game: EMPTY / PLAYER / ENEMY bodies plus FOOD,
+    # PLAYER_HEAD and ENEMY_HEAD markers
+    def observe(self):
+        games = np.arange(self.n)
+        obs = self.board.copy()
+        fed = self.food >= 0
+        obs[games[fed], self.food[fed]] = FOOD
+        obs[games, self.player_body[games, self.player_head]] = PLAYER_HEAD
+        obs[games, self.enemy_body[games, self.enemy_head]] = ENEMY_HEAD
+        return obs.reshape(self.n, self.height, self.width)
+
+# === Throughput check with random actions ===
+# e.g.  python snake_env.py --games 10000 --steps 200
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batched Snake environment")
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--steps", type=int, default=200)
+    parser.add_argument("--width", type=int, default=GRID_WIDTH)
+    parser.add_argument("--height", type=int, default=GRID_HEIGHT)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    env = SnakeEnv(args.games, args.width, args.height, seed=args.seed)
+    env.reset()
+    finished = 0
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        obs, reward, done, info = env.step(env.rng.integers(0, len(ACTIONS), args.games))
+        finished += int(done.sum())
+    elapsed = time.perf_counter() - start
+    print(f"{args.games} games x {args.steps} steps in {elapsed:.2f} s "
+          f"({args.games * args.steps / elapsed:,.0f} game-steps/s, {finished} games finished)")